@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Literal
+from typing import Dict, List, Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -9,6 +9,69 @@ class Settings(BaseSettings):
     host: str = "127.0.0.1"
     port: int = 8000
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "INFO"
+    log_json: bool = False
+    # Logger-prefix -> fraction of sub-WARNING records kept, e.g. {"ai_factory.services": 0.1}
+    log_sample_rates: Dict[str, float] = {}
+
+    # Upper bound on steps derived from one prompt (None = unlimited)
+    planner_max_steps: Optional[int] = 256
+
+    # Planner response cache (in-process LRU, optional SQLite tier)
+    planner_cache_enabled: bool = True
+    planner_cache_size: int = 1024
+    planner_cache_ttl: float = 300.0
+    planner_cache_sqlite: bool = False
+
+    # Batch planning: 0 workers plans in-process; >0 uses a process pool
+    planner_batch_max_size: int = 256
+    planner_batch_workers: int = 0
+    planner_batch_parallel_min: int = 16
+
+    # Async planner backends: default backend, task_type -> backend routing,
+    # default limits and optional per-backend {"concurrency", "timeout"} overrides
+    planner_backend: str = "stub"
+    planner_backend_routes: Dict[str, str] = {}
+    planner_backend_concurrency: int = 8
+    planner_backend_timeout: float = 30.0
+    planner_backend_overrides: Dict[str, Dict[str, float]] = {}
+    planner_fake_latency: float = 0.05
+
+    # Multi-worker mode (python -m ai_factory.serve): workers > 1 needs
+    # vector_store_mode "shared" so one process owns the vector collection
+    workers: int = 1
+    vector_store_mode: Literal["local", "shared"] = "local"
+    vector_store_socket: Optional[str] = None
+    sqlite_busy_timeout_ms: int = 5000
+
+    # Vector storage: "none" keeps vectors in the collection; float16/int8
+    # keep them quantized in RAM and re-rank the top n * vector_rerank hits
+    # exactly in float32 (0 = no re-rank)
+    vector_quantization: Literal["none", "float16", "int8"] = "none"
+    vector_rerank: int = 4
+
+    # Ingest dedup: "exact" keeps one vector per unique content, "minhash" also
+    # folds near-duplicates (estimated Jaccard >= threshold); "none" disables it
+    memory_dedup: Literal["none", "exact", "minhash"] = "exact"
+    memory_dedup_threshold: float = 0.9
+
+    # /memory/search result cache, invalidated whenever the collection changes
+    memory_search_cache_enabled: bool = True
+    memory_search_cache_size: int = 512
+    memory_search_cache_ttl: float = 60.0
+
+    # Debugger: fork server pre-imports these modules once and forks per run;
+    # optional address-space limit for snippets (MB, 0 = unlimited; runtimes
+    # like node or numpy reserve far more address space than they use)
+    debugger_fork_server: bool = False
+    debugger_preload_modules: List[str] = []
+    debugger_memory_limit_mb: int = 0
+    # Runtimes besides python that /debugger/run may execute: "bash", "node"
+    debugger_languages: List[str] = []
+
+    # Tracing: exporter "none" keeps spans as id carriers only
+    trace_exporter: Literal["none", "jsonl"] = "none"
+    trace_sample_rate: float = 1.0
+    trace_jsonl_path: Optional[str] = None
 
     @property
     def uvicorn_log_level(self) -> str:
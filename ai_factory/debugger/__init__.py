@@ -1,4 +1,7 @@
 __all__ = [
     "debugger_runner",
     "debugger_store",
+    "fork_server",
+    "limits",
+    "zygote",
 ]
@@ -1,38 +1,154 @@
 from __future__ import annotations
 
+import logging
+import os
+import shutil
 import tempfile
 import subprocess
 import sys
-import uuid
-from typing import Dict, Any
+import threading
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple
 
+from ai_factory.config import settings
+from ai_factory.debugger.fork_server import ForkServer
+from ai_factory.debugger.limits import limited_argv
+from ai_factory.metrics import timed
+from ai_factory.tracing import traced
 
-def run_python(code: str, timeout: int = 5) -> Dict[str, Any]:
-    """Execute Python code in a subprocess with a timeout, capturing stdout/stderr."""
-    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False, encoding="utf-8") as tmp:
+logger = logging.getLogger(__name__)
+
+Runner = Callable[[str, int], Dict[str, Any]]
+
+_fork_server: Optional[ForkServer] = None
+_fork_server_lock = threading.Lock()
+
+
+def get_fork_server() -> Optional[ForkServer]:
+    """The shared fork server when debugger_fork_server is enabled (started lazily)."""
+    global _fork_server
+    if not settings.debugger_fork_server:
+        return None
+    with _fork_server_lock:
+        if _fork_server is None:
+            _fork_server = ForkServer(settings.debugger_preload_modules, memory_limit_mb=settings.debugger_memory_limit_mb)
+    return _fork_server
+
+
+def shutdown_fork_server() -> None:
+    global _fork_server
+    with _fork_server_lock:
+        if _fork_server is not None:
+            _fork_server.shutdown()
+            _fork_server = None
+
+
+def run_file(argv: Sequence[str], code: str, suffix: str, timeout: int = 5) -> Dict[str, Any]:
+    """
+    Write code to a temp file and execute `argv + [file]` with the sandbox
+    limits and a wall-clock timeout, capturing stdout/stderr.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=suffix, delete=False, encoding="utf-8") as tmp:
         tmp.write(code)
         tmp_path = tmp.name
 
     try:
-        proc = subprocess.run(
-            [sys.executable, tmp_path],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
+        with timed("subprocess_spawn"):
+            proc = subprocess.Popen(
+                limited_argv([*argv, tmp_path], timeout, settings.debugger_memory_limit_mb),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+        try:
+            with timed("subprocess_exec"):
+                stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            stdout, stderr = proc.communicate()
+            return {"stdout": stdout or "", "stderr": (stderr or "") + "\nTimeoutExpired", "exit_code": 124, "status": "timeout"}
         return {
-            "stdout": proc.stdout,
-            "stderr": proc.stderr,
+            "stdout": stdout,
+            "stderr": stderr,
             "exit_code": proc.returncode,
             "status": "success" if proc.returncode == 0 else "error",
         }
-    except subprocess.TimeoutExpired as te:
-        return {"stdout": te.stdout or "", "stderr": (te.stderr or "") + "\nTimeoutExpired", "exit_code": 124, "status": "timeout"}
+    finally:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+@traced("debugger.run_python")
+def run_python(code: str, timeout: int = 5) -> Dict[str, Any]:
+    """
+    Execute Python code with a timeout, capturing stdout/stderr. Uses the fork
+    server (preloaded modules, no interpreter start-up) when enabled, and a
+    cold interpreter otherwise or if the fork server can't be reached. Never
+    falls back once the code was sent: it may already have run.
+    """
+    server = get_fork_server()
+    if server is not None:
+        try:
+            with timed("forkserver_run"):
+                return server.run(code, timeout=timeout)
+        except Exception:
+            logger.exception("Debugger fork server unavailable; falling back to a cold interpreter")
+    return run_file([sys.executable], code, ".py", timeout=timeout)
+
+
+# Language name -> runner. Register more with register_language().
+_LANGUAGES: Dict[str, Runner] = {}
+
+
+def register_language(names: Sequence[str], runner: Runner) -> None:
+    for name in names:
+        _LANGUAGES[name.lower()] = runner
+
+
+def supported_languages() -> List[str]:
+    return sorted(_LANGUAGES)
+
+
+def _interpreter(argv: Sequence[str], suffix: str, span: str) -> Runner:
+    @traced(span)
+    def run(code: str, timeout: int = 5) -> Dict[str, Any]:
+        return run_file(argv, code, suffix, timeout=timeout)
+
+    return run
+
+
+# Opt-in runtimes (settings.debugger_languages): executable -> (aliases, suffix, span)
+_OPTIONAL_LANGUAGES: Dict[str, Tuple[List[str], str, str]] = {
+    "bash": (["bash", "sh"], ".sh", "debugger.run_bash"),
+    "node": (["node", "javascript", "js"], ".js", "debugger.run_node"),
+}
+
+
+def configure_languages(names: Sequence[str]) -> None:
+    """Enable exactly the opt-in runtimes in names (python is always enabled)."""
+    for aliases, _, _ in _OPTIONAL_LANGUAGES.values():
+        for alias in aliases:
+            _LANGUAGES.pop(alias, None)
+    for name in names:
+        spec = _OPTIONAL_LANGUAGES.get(name.lower())
+        if spec is None:
+            logger.warning("Ignoring unknown debugger language %r (known: %s)", name, ", ".join(_OPTIONAL_LANGUAGES))
+            continue
+        executable = shutil.which(name.lower())
+        if executable is None:
+            logger.warning("Debugger language %s is enabled but not on PATH", name)
+            continue
+        aliases, suffix, span = spec
+        register_language(aliases, _interpreter([executable], suffix, span))
+
+
+register_language(["python", "py"], run_python)
+configure_languages(settings.debugger_languages)
 
 
 def run_code(language: str, code: str, timeout: int = 5) -> Dict[str, Any]:
-    lang = (language or "").lower()
-    if lang not in ("python", "py"):
+    runner = _LANGUAGES.get((language or "").lower())
+    if runner is None:
         return {"stdout": "", "stderr": f"Unsupported language: {language}", "exit_code": 2, "status": "error"}
-    return run_python(code, timeout=timeout)
-
+    return runner(code, timeout)
@@ -1,16 +1,79 @@
 from __future__ import annotations
 
-from typing import List
+import asyncio
+from datetime import datetime
+from typing import List, NamedTuple, Optional
 
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, func
 
-from ai_factory.memory.memory_db import SessionLocal, DebuggerRun, init_db
+from ai_factory.memory.memory_db import HAS_ASYNC_DB, async_session, async_write_lock, SessionLocal, DebuggerRun, init_db
+from ai_factory.metrics import timed
+from ai_factory.tracing import traced
 
 
+class RunRow(NamedTuple):
+    id: int
+    request_id: str
+    timestamp: Optional[datetime]
+    language: str
+    status: str
+
+
+class RunMatch(NamedTuple):
+    id: int
+    request_id: str
+    language: str
+    status: str
+    snippet: str
+
+
+# Statements are shared by the sync and async APIs (the *_async variants
+# await aiosqlite, or fall back to a worker thread without it)
+
+def _recent_stmt(limit: int):
+    return select(DebuggerRun).order_by(desc(DebuggerRun.timestamp)).limit(limit)
+
+
+def _by_request_id_stmt(request_id: str):
+    return select(DebuggerRun).where(DebuggerRun.request_id == request_id).order_by(desc(DebuggerRun.timestamp))
+
+
+def _matches(query: str):
+    like = f"%{query}%"
+    return (DebuggerRun.code.like(like)) | (DebuggerRun.stdout.like(like)) | (DebuggerRun.stderr.like(like))
+
+
+def _search_stmt(query: str, limit: int):
+    return select(DebuggerRun).where(_matches(query)).order_by(desc(DebuggerRun.timestamp)).limit(limit)
+
+
+def _list_runs_stmt(limit: int):
+    return (
+        select(DebuggerRun.id, DebuggerRun.request_id, DebuggerRun.timestamp, DebuggerRun.language, DebuggerRun.status)
+        .order_by(desc(DebuggerRun.timestamp), desc(DebuggerRun.id))
+        .limit(limit)
+    )
+
+
+def _snippets_stmt(query: str, limit: int, snippet_len: int):
+    snippet = func.substr(
+        func.coalesce(func.nullif(DebuggerRun.stdout, ""), func.nullif(DebuggerRun.stderr, ""), DebuggerRun.code),
+        1,
+        snippet_len,
+    )
+    return (
+        select(DebuggerRun.id, DebuggerRun.request_id, DebuggerRun.language, DebuggerRun.status, snippet)
+        .where(_matches(query))
+        .order_by(desc(DebuggerRun.timestamp))
+        .limit(limit)
+    )
+
+
+@traced("debugger.log_run")
 def log_run(request_id: str, language: str, code: str, stdout: str, stderr: str, status: str) -> None:
     """Persist a debugger run result into SQLite."""
     init_db()
-    with SessionLocal() as session:
+    with timed("sqlite_insert"), SessionLocal() as session:
         row = DebuggerRun(
             request_id=request_id,
             language=language,
@@ -23,31 +86,81 @@ def log_run(request_id: str, language: str, code: str, stdout: str, stderr: str,
         session.commit()
 
 
+@traced("debugger.log_run")
+async def log_run_async(request_id: str, language: str, code: str, stdout: str, stderr: str, status: str) -> None:
+    if not HAS_ASYNC_DB:
+        return await asyncio.to_thread(log_run, request_id, language, code, stdout, stderr, status)
+    init_db()
+    async with async_write_lock():
+        with timed("sqlite_insert"):
+            async with async_session() as session:
+                session.add(
+                    DebuggerRun(request_id=request_id, language=language, code=code, stdout=stdout, stderr=stderr, status=status)
+                )
+                await session.commit()
+
+
 def get_recent(limit: int = 10) -> List[DebuggerRun]:
     with SessionLocal() as session:
-        stmt = select(DebuggerRun).order_by(desc(DebuggerRun.timestamp)).limit(limit)
-        return list(session.scalars(stmt))
+        return list(session.scalars(_recent_stmt(limit)))
+
+
+async def get_recent_async(limit: int = 10) -> List[DebuggerRun]:
+    if not HAS_ASYNC_DB:
+        return await asyncio.to_thread(get_recent, limit)
+    async with async_session() as session:
+        return list(await session.scalars(_recent_stmt(limit)))
 
 
 def find_by_request_id(request_id: str) -> List[DebuggerRun]:
     with SessionLocal() as session:
-        stmt = select(DebuggerRun).where(DebuggerRun.request_id == request_id).order_by(desc(DebuggerRun.timestamp))
-        return list(session.scalars(stmt))
+        return list(session.scalars(_by_request_id_stmt(request_id)))
+
+
+async def find_by_request_id_async(request_id: str) -> List[DebuggerRun]:
+    if not HAS_ASYNC_DB:
+        return await asyncio.to_thread(find_by_request_id, request_id)
+    async with async_session() as session:
+        return list(await session.scalars(_by_request_id_stmt(request_id)))
 
 
 def search_runs(query: str, limit: int = 5) -> List[DebuggerRun]:
     """Very simple LIKE-based search over code/stdout/stderr."""
-    like = f"%{query}%"
     with SessionLocal() as session:
-        stmt = (
-            select(DebuggerRun)
-            .where(
-                (DebuggerRun.code.like(like))
-                | (DebuggerRun.stdout.like(like))
-                | (DebuggerRun.stderr.like(like))
-            )
-            .order_by(desc(DebuggerRun.timestamp))
-            .limit(limit)
-        )
-        return list(session.scalars(stmt))
+        return list(session.scalars(_search_stmt(query, limit)))
+
+
+async def search_runs_async(query: str, limit: int = 5) -> List[DebuggerRun]:
+    if not HAS_ASYNC_DB:
+        return await asyncio.to_thread(search_runs, query, limit)
+    async with async_session() as session:
+        return list(await session.scalars(_search_stmt(query, limit)))
+
+
+def list_runs(limit: int = 10) -> List[RunRow]:
+    """Latest runs for list pages; an index-only scan over ix_debugger_runs_list."""
+    with SessionLocal() as session:
+        return [RunRow._make(row) for row in session.execute(_list_runs_stmt(limit))]
+
+
+async def list_runs_async(limit: int = 10) -> List[RunRow]:
+    if not HAS_ASYNC_DB:
+        return await asyncio.to_thread(list_runs, limit)
+    async with async_session() as session:
+        return [RunRow._make(row) for row in await session.execute(_list_runs_stmt(limit))]
+
+
+def search_run_snippets(query: str, limit: int = 5, snippet_len: int = 240) -> List[RunMatch]:
+    """
+    Same matching as search_runs, but SQLite cuts the snippet (first non-empty
+    of stdout, stderr, code) so the full TEXT columns never leave the database.
+    """
+    with SessionLocal() as session:
+        return [RunMatch._make(row) for row in session.execute(_snippets_stmt(query, limit, snippet_len))]
+
 
+async def search_run_snippets_async(query: str, limit: int = 5, snippet_len: int = 240) -> List[RunMatch]:
+    if not HAS_ASYNC_DB:
+        return await asyncio.to_thread(search_run_snippets, query, limit, snippet_len)
+    async with async_session() as session:
+        return [RunMatch._make(row) for row in await session.execute(_snippets_stmt(query, limit, snippet_len))]
@@ -0,0 +1,92 @@
+"""
+App-side client for the debugger fork server (see ai_factory.debugger.zygote).
+
+ForkServer starts the zygote lazily (or from the app lifespan), restarts it
+if it dies, and sends one run per connection.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from ai_factory.debugger.zygote import recv_frame, send_frame
+
+logger = logging.getLogger(__name__)
+
+
+class ForkServer:
+    def __init__(self, preload: Sequence[str] = (), memory_limit_mb: int = 0, socket_path: Optional[str] = None):
+        self.preload: List[str] = list(preload)
+        self.memory_limit_mb = memory_limit_mb
+        self.socket_path = socket_path or os.path.join(tempfile.gettempdir(), f"ai_factory_zygote_{os.getpid()}.sock")
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self, wait: float = 60.0) -> None:
+        """Start the zygote (no-op if it is up) and wait until it accepts runs."""
+        with self._lock:
+            if self.running:
+                return
+            cmd = [sys.executable, "-m", "ai_factory.debugger.zygote", "--socket", self.socket_path, "--preload", *self.preload]
+            self._proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL)
+            deadline = time.monotonic() + wait
+            while True:
+                try:
+                    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                        probe.connect(self.socket_path)
+                    break
+                except OSError:
+                    if self._proc.poll() is not None or time.monotonic() >= deadline:
+                        self._kill()
+                        raise RuntimeError("debugger fork server failed to start")
+                    time.sleep(0.02)
+            logger.info("Debugger fork server up (preloaded: %s)", ", ".join(self.preload) or "-")
+
+    def run(self, code: str, timeout: float = 5) -> Dict[str, Any]:
+        """
+        Run code in a forked child. Raises if the server can't be started or
+        reached (callers may retry elsewhere); once the request is sent the
+        code may have run, so failures after that are returned as the result.
+        """
+        if not self.running:
+            self.start()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            # The zygote enforces the run timeout; this only guards against a wedged server
+            conn.settimeout(timeout + 10)
+            conn.connect(self.socket_path)
+            send_frame(conn, {"code": code, "timeout": timeout, "memory_limit_mb": self.memory_limit_mb})
+            try:
+                return recv_frame(conn)
+            except socket.timeout:
+                logger.error("Debugger fork server sent no result within %ss", timeout + 10)
+                return {"stdout": "", "stderr": "\nTimeoutExpired", "exit_code": 124, "status": "timeout"}
+            except (OSError, ValueError) as e:
+                logger.error("Debugger fork server failed mid-run: %s", e)
+                return {"stdout": "", "stderr": f"Debugger fork server failed: {e}", "exit_code": 1, "status": "error"}
+
+    def _kill(self) -> None:
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc.wait()
+            self._proc = None
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._proc is not None and self._proc.poll() is None:
+                self._proc.terminate()
+                try:
+                    self._proc.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self._proc.kill()
+            self._proc = None
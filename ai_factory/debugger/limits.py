@@ -0,0 +1,50 @@
+"""
+Sandbox resource limits for debugger snippets.
+
+Applied inside the snippet process itself: by fork-server children directly,
+and for cold runs by running this file as a tiny wrapper that sets the limits
+and then execs the interpreter:
+
+    python -S ai_factory/debugger/limits.py TIMEOUT MEMORY_LIMIT_MB ARGV...
+
+subprocess's preexec_fn would avoid the extra exec, but it runs Python code
+between fork and exec, which can deadlock in a multi-threaded parent like the
+app server. Kept to os/sys/resource so the wrapper adds only interpreter startup.
+"""
+from __future__ import annotations
+
+import os
+import sys
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - non-POSIX
+    resource = None  # type: ignore[assignment]
+
+# Largest file a snippet may write
+_FSIZE_LIMIT = 64 * 1024 * 1024
+
+
+def apply_limits(timeout: float, memory_limit_mb: int = 0) -> None:
+    """
+    Sandbox limits for a snippet process: CPU seconds a little above the wall
+    timeout, address space (0 = unlimited) and maximum file size.
+    """
+    if resource is None:
+        return
+    cpu = int(timeout) + 1
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (_FSIZE_LIMIT, _FSIZE_LIMIT))
+    if memory_limit_mb > 0:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def limited_argv(argv: list[str], timeout: float, memory_limit_mb: int = 0) -> list[str]:
+    """argv wrapped so the process applies the limits to itself before exec'ing argv."""
+    return [sys.executable, "-S", os.path.abspath(__file__), str(timeout), str(memory_limit_mb), *argv]
+
+
+if __name__ == "__main__":
+    apply_limits(float(sys.argv[1]), int(sys.argv[2]))
+    os.execv(sys.argv[3], sys.argv[3:])
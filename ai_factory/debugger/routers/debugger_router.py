@@ -2,14 +2,14 @@ from __future__ import annotations
 
 import json
 import logging
-import uuid
 from typing import Dict, Any
 
 from fastapi import APIRouter, HTTPException, Query
 
 from ai_factory.debugger.debugger_runner import run_code
-from ai_factory.debugger.debugger_store import log_run, get_recent, search_runs
+from ai_factory.debugger.debugger_store import log_run, list_runs_async, search_run_snippets_async
 from ai_factory.memory.memory_embeddings import add_to_memory
+from ai_factory.tracing import new_request_id
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +23,7 @@ def run(payload: Dict[str, Any]):
     if not code:
         raise HTTPException(status_code=400, detail="code must not be empty")
 
-    req_id = str(uuid.uuid4())
+    req_id = new_request_id()
     result = run_code(language=language, code=code, timeout=5)
     try:
         log_run(
@@ -53,8 +53,8 @@ def run(payload: Dict[str, Any]):
 
 
 @router.get("/logs")
-def logs(limit: int = Query(10, ge=1, le=200)):
-    rows = get_recent(limit=limit)
+async def logs(limit: int = Query(10, ge=1, le=200)):
+    rows = await list_runs_async(limit=limit)
     return [
         {
             "id": r.id,
@@ -68,8 +68,8 @@ def logs(limit: int = Query(10, ge=1, le=200)):
 
 
 @router.get("/search")
-def search(q: str = Query(..., min_length=1), n: int = Query(5, ge=1, le=50)):
-    matches = search_runs(q, limit=n)
+async def search(q: str = Query(..., min_length=1), n: int = Query(5, ge=1, le=50)):
+    matches = await search_run_snippets_async(q, limit=n)
     return {
         "query": q,
         "results": [
@@ -78,7 +78,7 @@ def search(q: str = Query(..., min_length=1), n: int = Query(5, ge=1, le=50)):
                 "request_id": r.request_id,
                 "language": r.language,
                 "status": r.status,
-                "snippet": (r.stdout or r.stderr or r.code)[:240],
+                "snippet": r.snippet,
             }
             for r in matches
         ],
@@ -0,0 +1,235 @@
+"""
+Debugger fork server ("zygote").
+
+A long-lived interpreter that imports a configured module list once and then
+serves runs over a Unix socket. Each connection is handled in a forked copy
+of the zygote, which forks again to execute the snippet (copy-on-write, so
+preloaded modules cost nothing per run) while the handler enforces the
+timeout and collects stdout/stderr.
+
+Deliberately stdlib-only: the zygote must start fast and must not carry the
+app's threads, sockets or database connections into its children.
+
+    python -m ai_factory.debugger.zygote --socket PATH [--preload numpy pandas]
+
+Wire format: 4-byte big-endian length + JSON, one request and one response
+per connection. Request: {"code", "timeout", "memory_limit_mb"}.
+Response: {"stdout", "stderr", "exit_code", "status"}.
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import random
+import selectors
+import signal
+import socket
+import struct
+import sys
+import time
+import traceback
+from typing import Any, Dict, List, Optional
+
+from ai_factory.debugger.limits import apply_limits
+
+_HEADER = struct.Struct(">I")
+
+
+def send_frame(sock: socket.socket, payload: Any) -> None:
+    body = json.dumps(payload).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(body)) + body)
+
+
+def recv_frame(sock: socket.socket) -> Any:
+    def exact(n: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = sock.recv(n - len(buf))
+            if not chunk:
+                raise ConnectionError("fork server connection closed")
+            buf.extend(chunk)
+        return bytes(buf)
+
+    (size,) = _HEADER.unpack(exact(_HEADER.size))
+    return json.loads(exact(size))
+
+
+def _exec_snippet(code: str) -> int:
+    """Run code as __main__ the way `python file.py` would; return the exit code."""
+    sys.argv = ["<debugger>"]
+    scope = {"__name__": "__main__", "__builtins__": __builtins__}
+    try:
+        exec(compile(code, "<debugger>", "exec"), scope)
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException:
+        etype, value, tb = sys.exc_info()
+        # Drop this frame so the traceback starts in the snippet
+        traceback.print_exception(etype, value, tb.tb_next if tb else None)
+        return 1
+    return 0
+
+
+def _run_child(code: str, timeout: float, memory_limit_mb: int, out_w: int, err_w: int) -> None:
+    os.setpgid(0, 0)
+    os.dup2(out_w, 1)
+    os.dup2(err_w, 2)
+    os.close(out_w)
+    os.close(err_w)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    sys.stdout = open(1, "w", encoding="utf-8", errors="replace", closefd=False)
+    sys.stderr = open(2, "w", encoding="utf-8", errors="replace", closefd=False)
+    random.seed()
+    rc = 1
+    try:
+        apply_limits(timeout, memory_limit_mb)
+        rc = _exec_snippet(code)
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(rc & 0xFF)
+
+
+def _kill_group(pid: int) -> None:
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _collect(pid: int, out_r: int, err_r: int, timeout: float) -> Dict[str, Any]:
+    chunks: Dict[int, List[bytes]] = {out_r: [], err_r: []}
+    sel = selectors.DefaultSelector()
+    sel.register(out_r, selectors.EVENT_READ)
+    sel.register(err_r, selectors.EVENT_READ)
+    deadline = time.monotonic() + timeout
+    timed_out = False
+    open_fds = 2
+    while open_fds:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 and not timed_out:
+            timed_out = True
+            _kill_group(pid)
+            # Give killed processes a moment to close their pipe ends
+            deadline = time.monotonic() + 1.0
+            continue
+        if remaining <= 0:
+            break
+        for key, _ in sel.select(remaining):
+            data = os.read(key.fd, 65536)
+            if data:
+                chunks[key.fd].append(data)
+            else:
+                sel.unregister(key.fd)
+                open_fds -= 1
+    sel.close()
+    os.close(out_r)
+    os.close(err_r)
+    # EOF doesn't mean exit: a snippet can close its pipes and keep running,
+    # so the same deadline applies while waiting for it
+    delay = 0.001
+    while not timed_out:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            break
+        if time.monotonic() >= deadline:
+            timed_out = True
+            _kill_group(pid)
+            break
+        time.sleep(delay)
+        delay = min(delay * 2, 0.05)
+    if timed_out:
+        _, status = os.waitpid(pid, 0)
+    stdout = b"".join(chunks[out_r]).decode("utf-8", errors="replace")
+    stderr = b"".join(chunks[err_r]).decode("utf-8", errors="replace")
+    if timed_out:
+        return {"stdout": stdout, "stderr": stderr + "\nTimeoutExpired", "exit_code": 124, "status": "timeout"}
+    exit_code = os.waitstatus_to_exitcode(status)
+    return {"stdout": stdout, "stderr": stderr, "exit_code": exit_code, "status": "success" if exit_code == 0 else "error"}
+
+
+def _handle(conn: socket.socket) -> None:
+    request = recv_frame(conn)
+    timeout = float(request.get("timeout", 5))
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        conn.close()
+        os.close(out_r)
+        os.close(err_r)
+        _run_child(request.get("code", ""), timeout, int(request.get("memory_limit_mb", 0)), out_w, err_w)
+    try:
+        # Also set here so a timeout can't race the child's own setpgid
+        os.setpgid(pid, pid)
+    except OSError:
+        pass
+    os.close(out_w)
+    os.close(err_w)
+    send_frame(conn, _collect(pid, out_r, err_r, timeout))
+
+
+def serve(path: str, preload: List[str]) -> None:
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"zygote: could not preload {name}: {e}", file=sys.stderr)
+
+    if os.path.exists(path):
+        os.unlink(path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(64)
+    # Handlers exit on their own; let the kernel reap them
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        while True:
+            conn, _ = listener.accept()
+            if os.fork() == 0:
+                listener.close()
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                code = 0
+                try:
+                    _handle(conn)
+                except ConnectionError:
+                    pass  # readiness probe, or the client went away
+                except BaseException:
+                    traceback.print_exc()
+                    code = 1
+                finally:
+                    os._exit(code)
+            conn.close()
+    finally:
+        listener.close()
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Debugger fork server with preloaded modules.")
+    parser.add_argument("--socket", required=True)
+    parser.add_argument("--preload", nargs="*", default=[])
+    args = parser.parse_args(argv)
+    try:
+        serve(args.socket, args.preload)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
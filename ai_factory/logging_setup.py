@@ -1,11 +1,20 @@
+import copy
 import logging
 import os
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+
+from ai_factory.serialization import dumps
+from ai_factory.tracing import TraceContextFilter
 
 LOG_DIR = os.path.join(os.path.dirname(__file__), "data", "logs")
 LOG_FILE = os.path.join(LOG_DIR, "app.log")
 
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
 
 def ensure_log_dir(path: Optional[str] = None) -> str:
     p = path or LOG_DIR
@@ -13,9 +22,72 @@ def ensure_log_dir(path: Optional[str] = None) -> str:
     return p
 
 
-def setup_logging(level: str = "INFO") -> None:
-    """Configure root logging for both console and rotating file."""
-    ensure_log_dir()
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, trace_id, message (+ exc)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S%z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "trace_id": getattr(record, "trace_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return dumps(entry).decode("utf-8")
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records unformatted. The stock prepare()
+    formats the message and traceback on the calling thread and clears
+    exc_info, which leaves nothing for JsonFormatter's "exc" field.
+    Args are shared with the caller until the listener formats them.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Copy so other handlers of the same record never see our changes
+        return copy.copy(record)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of sub-WARNING records per logger prefix, e.g.
+    {"ai_factory.services.planner_service": 0.01}. Warnings and errors always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Longest prefix wins
+        self.rates = sorted(rates.items(), key=lambda kv: len(kv[0]), reverse=True)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        for prefix, rate in self.rates:
+            if record.name == prefix or record.name.startswith(prefix + "."):
+                return rate >= 1 or random.random() < rate
+        return True
+
+
+def setup_logging(
+    level: str = "INFO",
+    json_format: bool = False,
+    sample_rates: Optional[Dict[str, float]] = None,
+    log_file: Optional[str] = None,
+) -> None:
+    """
+    Configure root logging for both console and rotating file.
+    Callers only enqueue records; a QueueListener thread does the formatting
+    (messages and tracebacks included) and file I/O (including rotation), so
+    log writes stay off the request path.
+    """
+    global _listener, _queue_handler
+    log_file = log_file or LOG_FILE
+    ensure_log_dir(os.path.dirname(log_file))
+    shutdown_logging()
+
     logger = logging.getLogger()
     logger.setLevel(level)
 
@@ -23,19 +95,46 @@ def setup_logging(level: str = "INFO") -> None:
     for h in list(logger.handlers):
         logger.removeHandler(h)
 
-    formatter = logging.Formatter(
-        fmt="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%dT%H:%M:%S%z",
-    )
+    if json_format:
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            fmt="%(asctime)s | %(levelname)s | %(name)s | %(trace_id)s | %(message)s",
+            datefmt="%Y-%m-%dT%H:%M:%S%z",
+        )
 
     # Console
     ch = logging.StreamHandler()
     ch.setLevel(level)
     ch.setFormatter(formatter)
-    logger.addHandler(ch)
 
     # File (rotating ~5MB x 3)
-    fh = RotatingFileHandler(LOG_FILE, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8")
+    fh = RotatingFileHandler(log_file, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8")
     fh.setLevel(level)
     fh.setFormatter(formatter)
-    logger.addHandler(fh)
+
+    # Filters run on the caller's thread, where the trace context lives
+    qh = DeferredQueueHandler(queue.SimpleQueue())
+    qh.setLevel(level)
+    qh.addFilter(TraceContextFilter())
+    if sample_rates:
+        qh.addFilter(SamplingFilter(sample_rates))
+    logger.addHandler(qh)
+
+    _queue_handler = qh
+    _listener = QueueListener(qh.queue, ch, fh, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Drain queued records, stop the listener thread and close the handlers."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        for h in _listener.handlers:
+            h.flush()
+            h.close()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
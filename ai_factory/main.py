@@ -2,27 +2,42 @@ import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from ai_factory.config import settings
-from ai_factory.logging_setup import setup_logging, ensure_log_dir
+from ai_factory.logging_setup import setup_logging, shutdown_logging, ensure_log_dir
+from ai_factory.serialization import FastJSONResponse
+from ai_factory import tracing
 from ai_factory.routers import health as health_router
 from ai_factory.routers import planner as planner_router
+from ai_factory.routers import metrics as metrics_router
 
 # Phase 2+ imports
-from ai_factory.memory.memory_db import init_db
+from ai_factory.memory.memory_db import init_db, dispose_engines
 from ai_factory.memory.routers import memory_router
-from ai_factory.services.middleware import MemoryLoggerMiddleware
+from ai_factory.services.middleware import MemoryLoggerMiddleware, DebugLoggerMiddleware
 from ai_factory.debugger.routers import debugger_router
+from ai_factory.debugger.debugger_runner import get_fork_server, shutdown_fork_server
+from ai_factory.services.planner_service import shutdown_pool
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     ensure_log_dir()
-    setup_logging(settings.log_level)
+    setup_logging(settings.log_level, json_format=settings.log_json, sample_rates=settings.log_sample_rates)
+    tracing.configure_from_settings(settings)
     init_db()
+    fork_server = get_fork_server()
+    if fork_server is not None:
+        # Pay the preload imports at startup rather than on the first run
+        fork_server.start()
     logging.getLogger(__name__).info("Starting AI Factory Router Core + Memory MCP + Debugger MCP (Phase 3)")
     yield
     # Shutdown
+    shutdown_pool()
+    shutdown_fork_server()
+    await dispose_engines()
+    tracing.shutdown()
     logging.getLogger(__name__).info("Shutting down AI Factory")
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -30,16 +45,19 @@ app = FastAPI(
     version="0.3.0",
     description="Phase 3: Debugger MCP with safe code execution, SQLite logging, and semantic recall.",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
-# Middleware (planner request/response logger)
+# Middleware (planner request/response logger, debugger timing headers)
 app.add_middleware(MemoryLoggerMiddleware)
+app.add_middleware(DebugLoggerMiddleware)
 
 # Routers
 app.include_router(health_router.router)
 app.include_router(planner_router.router)
 app.include_router(memory_router.router)
 app.include_router(debugger_router.router)
+app.include_router(metrics_router.router)
 
 
 # Root
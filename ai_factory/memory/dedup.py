@@ -0,0 +1,114 @@
+"""
+Ingest-time deduplication for the memory vector store.
+
+Every document is stored under a content id (hash of its whitespace-normalized
+dedup key), so identical content embeds once no matter how many requests
+produce it. Optionally, a MinHash/LSH index maps near-duplicates (estimated
+Jaccard similarity over word shingles >= threshold) onto an existing document.
+Which requests produced a document is tracked in SQLite (memory_doc_refs).
+"""
+from __future__ import annotations
+
+import hashlib
+import random
+import threading
+from typing import Dict, List, Optional, Sequence, Set
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - pure-Python signatures are used instead
+    np = None  # type: ignore[assignment]
+
+_MERSENNE = (1 << 61) - 1
+# 31-bit shingle hashes and coefficients keep a * h + b below 2**63 (uint64-safe)
+_HASH_MAX = (1 << 31) - 1
+
+
+def content_id(text: str) -> str:
+    """Stable document id for text; whitespace differences don't matter."""
+    normalized = " ".join(text.split())
+    return "doc-" + hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles, using universal hashing
+    (a * h + b) mod p on one 31-bit base hash per shingle (vectorized with
+    numpy when available; both paths give identical signatures).
+    """
+
+    def __init__(self, num_perm: int = 64, shingle: int = 3, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.shingle = shingle
+        self._params = [(rng.randrange(1, _HASH_MAX), rng.randrange(0, _HASH_MAX)) for _ in range(num_perm)]
+        if np is not None:
+            self._a = np.array([a for a, _ in self._params], dtype=np.uint64)[:, None]
+            self._b = np.array([b for _, b in self._params], dtype=np.uint64)[:, None]
+
+    def _shingles(self, text: str) -> Set[int]:
+        words = text.lower().split()
+        k = min(self.shingle, len(words)) or 1
+        grams = {" ".join(words[i : i + k]) for i in range(max(1, len(words) - k + 1))}
+        return {int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "big") & _HASH_MAX for g in grams}
+
+    def signature(self, text: str) -> List[int]:
+        hashes = self._shingles(text)
+        if np is not None:
+            h = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+            return ((self._a * h + self._b) % np.uint64(_MERSENNE)).min(axis=1).tolist()
+        return [min((a * h + b) % _MERSENNE for h in hashes) for a, b in self._params]
+
+
+def estimated_similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class MinHashIndex:
+    """
+    LSH over MinHash signatures (bands x rows = num_perm). find() returns the
+    id of an indexed document whose estimated similarity is >= threshold.
+    In-process: near-duplicate detection covers documents ingested here.
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 64, bands: int = 8):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm)
+        self._buckets: List[Dict[tuple, List[str]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _bands(self, sig: List[int]):
+        for b in range(self.bands):
+            yield b, tuple(sig[b * self.rows : (b + 1) * self.rows])
+
+    def find(self, text: str, signature: Optional[List[int]] = None) -> Optional[str]:
+        sig = signature or self.hasher.signature(text)
+        best_id, best = None, self.threshold
+        with self._lock:
+            seen: Set[str] = set()
+            for b, key in self._bands(sig):
+                for doc_id in self._buckets[b].get(key, ()):
+                    if doc_id in seen:
+                        continue
+                    seen.add(doc_id)
+                    sim = estimated_similarity(sig, self._signatures[doc_id])
+                    if sim >= best:
+                        best_id, best = doc_id, sim
+        return best_id
+
+    def add(self, doc_id: str, text: str, signature: Optional[List[int]] = None) -> None:
+        sig = signature or self.hasher.signature(text)
+        with self._lock:
+            if doc_id in self._signatures:
+                return
+            self._signatures[doc_id] = sig
+            for b, key in self._bands(sig):
+                self._buckets[b].setdefault(key, []).append(doc_id)
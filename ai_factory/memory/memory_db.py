@@ -1,21 +1,49 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import weakref
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional, Set, Tuple
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, select
+from sqlalchemy import create_engine, event, Column, Index, Integer, String, Text, DateTime, select
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
 
+from ai_factory.config import settings
+
+try:
+    import aiosqlite  # noqa: F401  (driver for the async engine)
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    HAS_ASYNC_DB = True
+except ImportError:
+    HAS_ASYNC_DB = False
+
 # Data paths (under ai_factory/data/)
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
-DB_PATH = os.path.join(DATA_DIR, "memory.db")
+# AI_FACTORY_DB_PATH points the app at another SQLite file (benchmarks, scratch runs)
+DB_PATH = os.getenv("AI_FACTORY_DB_PATH") or os.path.join(DATA_DIR, "memory.db")
 
 Base = declarative_base()
 engine = create_engine(f"sqlite:///{DB_PATH}", echo=False, future=True)
 SessionLocal = sessionmaker(bind=engine, expire_on_commit=False, class_=Session)
 
 
+def _sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    # Several workers share this file: WAL lets readers run alongside the
+    # single writer, and busy_timeout waits for the write lock instead of
+    # failing immediately with "database is locked"
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.close()
+
+
+event.listen(engine, "connect", _sqlite_pragmas)
+
+
 class MemoryEvent(Base):
     __tablename__ = "memory_events"
     id = Column(Integer, primary_key=True)
@@ -38,12 +66,109 @@ class DebuggerRun(Base):
     status = Column(String, nullable=False)
 
 
+class PlannerCacheEntry(Base):
+    __tablename__ = "planner_cache"
+    key = Column(String, primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    task_type = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+
+
+class MemoryDocRef(Base):
+    """One row per (vector document, request) occurrence; see memory.dedup."""
+    __tablename__ = "memory_doc_refs"
+    id = Column(Integer, primary_key=True)
+    doc_id = Column(String, index=True, nullable=False)
+    request_id = Column(String, index=True, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# Covering indexes for list endpoints: newest-first pages over these columns
+# are answered from the index without touching the large TEXT columns.
+# (/memory/logs returns the prompt, so ix_memory_events_timestamp, which
+# already carries the rowid, is as good as it gets there.)
+COVERING_INDEXES = (
+    Index(
+        "ix_debugger_runs_list",
+        DebuggerRun.timestamp,
+        DebuggerRun.id,
+        DebuggerRun.request_id,
+        DebuggerRun.language,
+        DebuggerRun.status,
+    ),
+)
+
+_initialized = False
+
+
 def init_db() -> None:
     """
     Ensure data directory and SQLite schema are created.
+    Runs once per process; later calls (one per logged event) are free.
     """
-    os.makedirs(DATA_DIR, exist_ok=True)
+    global _initialized
+    if _initialized:
+        return
+    os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
     Base.metadata.create_all(engine)
+    # create_all skips indexes on tables that already exist, so add new ones explicitly
+    for index in COVERING_INDEXES:
+        index.create(engine, checkfirst=True)
+    _initialized = True
+
+
+# Per event loop: asyncio locks can't be shared between loops
+_write_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+
+def async_write_lock() -> asyncio.Lock:
+    """
+    Serializes async writes within the process. SQLite admits one writer at a
+    time anyway; queueing on a lock is much cheaper than concurrent
+    connections backing off in the busy handler.
+    """
+    loop = asyncio.get_running_loop()
+    lock = _write_locks.get(loop)
+    if lock is None:
+        lock = _write_locks[loop] = asyncio.Lock()
+    return lock
+
+
+# Async engines, one per event loop: an aiosqlite connection belongs to the
+# loop that opened it, so each loop pools its own and reuses them across
+# requests (connect, worker thread and pragmas once per connection, not per
+# write). A queue pool rather than StaticPool: concurrent sessions (reads
+# alongside the locked writer) each need their own connection, or one
+# session's rollback would discard another's pending rows. Not weak-keyed like _write_locks: a closed loop's engine still has
+# connection threads to stop, which the next loop to open an engine does.
+_async_engines: "Dict[asyncio.AbstractEventLoop, Tuple[AsyncEngine, async_sessionmaker]]" = {}
+_disposing: "Set[asyncio.Task]" = set()
+
+
+def async_session() -> "AsyncSession":
+    """A session on the running loop's pooled async engine (only when HAS_ASYNC_DB)."""
+    loop = asyncio.get_running_loop()
+    entry = _async_engines.get(loop)
+    if entry is None:
+        for closed in [other for other in _async_engines if other.is_closed()]:
+            task = loop.create_task(_async_engines.pop(closed)[0].dispose())
+            _disposing.add(task)
+            task.add_done_callback(_disposing.discard)
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{DB_PATH}", poolclass=AsyncAdaptedQueuePool)
+        event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas)
+        entry = _async_engines[loop] = (
+            async_engine,
+            async_sessionmaker(bind=async_engine, expire_on_commit=False, class_=AsyncSession),
+        )
+    return entry[1]()
+
+
+async def dispose_engines() -> None:
+    """Close pooled connections on shutdown so SQLite can checkpoint the WAL."""
+    engine.dispose()
+    while _async_engines:
+        _, (async_engine, _) = _async_engines.popitem()
+        await async_engine.dispose()
 
 
 def get_session() -> Session:
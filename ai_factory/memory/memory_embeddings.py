@@ -3,18 +3,26 @@ from __future__ import annotations
 import hashlib
 import logging
 import os
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Optional, Sequence, Set, Tuple
 
 import chromadb
 from chromadb.utils import embedding_functions
 
-from ai_factory.memory.memory_store import get_recent
+from ai_factory.config import settings
+from ai_factory.memory.dedup import MinHashIndex, content_id
+from ai_factory.memory.memory_store import get_recent, record_doc_refs
+from ai_factory.memory.search_cache import SearchResultCache, search_key
+from ai_factory.metrics import registry, timed
+from ai_factory.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 # Persistent Chroma directory under ai_factory/data/chroma
 CHROMA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "chroma")
 os.makedirs(CHROMA_PATH, exist_ok=True)
+# Quantized vector store (vector_quantization != "none"), see vector_index
+VECTOR_INDEX_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "vector_index")
 
 
 def _hash_vector(text: str, dim: int = 128) -> List[float]:
@@ -62,34 +70,224 @@ def _init_embedding_function():
         return HashEmbeddingFunction()
 
 
-# Initialize Chroma persistent client & collection
-client = chromadb.PersistentClient(path=CHROMA_PATH)
+def build_local_collection(embedding_function=None):
+    """Open the persistent memory collection in this process."""
+    ef = embedding_function or embedding_fn
+    local_client = chromadb.PersistentClient(path=CHROMA_PATH)
+    local = local_client.get_or_create_collection(name="memory", embedding_function=ef, metadata={"hnsw:space": "cosine"})
+    if settings.vector_quantization == "none":
+        return local
+
+    from ai_factory.memory.vector_index import HAS_NUMPY, QuantizedCollection, QuantizedVectorIndex
+
+    if not HAS_NUMPY:
+        logger.warning("vector_quantization=%s needs numpy; using unquantized vectors.", settings.vector_quantization)
+        return local
+    index = QuantizedVectorIndex(settings.vector_quantization, path=VECTOR_INDEX_PATH)
+    quantized = QuantizedCollection(index, ef, rerank=settings.vector_rerank, path=VECTOR_INDEX_PATH)
+    if quantized.count() == 0 and local.count():
+        # First start with quantization on: bring over what the Chroma collection holds
+        logger.info("Imported %d documents from the Chroma collection.", quantized.import_from(local))
+    logger.info(
+        "Using %s quantized vector index (rerank x%d), %d documents.",
+        settings.vector_quantization,
+        settings.vector_rerank,
+        quantized.count(),
+    )
+    return quantized
+
+
+def _init_collection():
+    """
+    vector_store_mode=local keeps the collection in-process (single worker).
+    vector_store_mode=shared talks to the vector server that owns it, so every
+    worker sees the same documents; embeddings are still computed here.
+    """
+    if settings.vector_store_mode == "shared":
+        from ai_factory.memory.vector_server import DEFAULT_SOCKET_PATH, RemoteCollection
+
+        path = settings.vector_store_socket or DEFAULT_SOCKET_PATH
+        logger.info("Using shared vector store at %s", path)
+        return RemoteCollection(path)
+    return build_local_collection()
+
+
+# Initialize embeddings & collection
 embedding_fn = _init_embedding_function()
-collection = client.get_or_create_collection(name="memory", embedding_function=embedding_fn, metadata={"hnsw:space": "cosine"})
+collection = _init_collection()
+
+search_cache = (
+    SearchResultCache(maxsize=settings.memory_search_cache_size, ttl=settings.memory_search_cache_ttl)
+    if settings.memory_search_cache_enabled
+    else None
+)
 
+registry.gauge("ai_factory_vector_collection_size", "Documents in the memory vector collection.", lambda: float(collection.count()))
 
-def add_to_memory(request_id: str, text: str) -> None:
+# Ingest dedup: "exact" stores one document per content id, "minhash" also
+# folds near-duplicates into an existing document
+near_dup_index = MinHashIndex(threshold=settings.memory_dedup_threshold) if settings.memory_dedup == "minhash" else None
+if near_dup_index is not None and settings.vector_store_mode == "shared":
+    logger.warning("memory_dedup=minhash is per worker in shared mode: near-duplicates fold only within one worker.")
+_ingest_counts = {"embedded": 0, "exact_duplicate": 0, "near_duplicate": 0}
+_ingest_lock = threading.Lock()
+
+registry.gauge(
+    "ai_factory_memory_ingest_documents",
+    "Documents offered to the memory store, by dedup outcome.",
+    lambda: {(k,): float(v) for k, v in _ingest_counts.items()},
+    label_names=("outcome",),
+)
+
+# Bumped after every local add; a shared collection keeps its own counter
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def collection_generation() -> int:
+    """Counter that changes whenever the collection's contents change."""
+    remote = getattr(collection, "generation", None)
+    return remote() if remote is not None else _generation
+
+
+def _embed_and_add(texts: List[str], ids: List[str]) -> None:
+    global _generation
+    # Embed explicitly so embedding and vector-store time are measured separately
+    with timed("embedding"):
+        vectors = embedding_fn(texts)
+    with timed("vector_add"):
+        collection.add(documents=texts, ids=ids, embeddings=vectors)
+    with _generation_lock:
+        _generation += 1
+
+
+def _free_ids(ids: Sequence[str]) -> List[str]:
     """
-    Add a text document to the memory vector store keyed by request_id.
-    If the id already exists, it will upsert by adding a suffix.
+    Ids that don't collide with the collection or with each other: a taken id
+    gets the first free suffix among id:2, id:3, ...
+    """
+    result = list(ids)
+    claimed: Set[str] = set()
+    attempt = {i: 1 for i in range(len(ids))}
+    pending = list(range(len(ids)))
+    while pending:
+        candidates = [ids[i] if attempt[i] == 1 else f"{ids[i]}:{attempt[i]}" for i in pending]
+        existing = collection.get(ids=list(dict.fromkeys(candidates)))
+        taken = set(existing.get("ids") or []) if existing else set()
+        retry = []
+        for i, candidate in zip(pending, candidates):
+            if candidate in taken or candidate in claimed:
+                attempt[i] += 1
+                retry.append(i)
+            else:
+                claimed.add(candidate)
+                result[i] = candidate
+        pending = retry
+    return result
+
+
+def _ingest(items: Sequence[Tuple[str, str]], keys: Sequence[str]) -> List[Tuple[str, str]]:
+    """
+    Deduplicating add: each item maps to a content id (or to a near-duplicate
+    already indexed); only documents not yet in the collection are embedded.
+    Returns the (doc_id, request_id) reference of every item.
+    """
+    doc_ids = [content_id(k) for k in keys]
+    near = 0
+    if near_dup_index is not None:
+        # Sequential so near-duplicates inside one batch fold together too
+        for i, key in enumerate(keys):
+            sig = near_dup_index.hasher.signature(key)
+            match = near_dup_index.find(key, sig)
+            if match is not None and match != doc_ids[i]:
+                doc_ids[i] = match
+                near += 1
+            else:
+                near_dup_index.add(doc_ids[i], key, sig)
+
+    existing = collection.get(ids=list(dict.fromkeys(doc_ids)))
+    taken = set(existing.get("ids") or []) if existing else set()
+    new_ids: List[str] = []
+    new_texts: List[str] = []
+    for doc_id, (_, text) in zip(doc_ids, items):
+        if doc_id not in taken:
+            taken.add(doc_id)
+            new_ids.append(doc_id)
+            new_texts.append(text)
+    if new_ids:
+        _embed_and_add(new_texts, new_ids)
+    with _ingest_lock:
+        _ingest_counts["embedded"] += len(new_ids)
+        _ingest_counts["near_duplicate"] += near
+        _ingest_counts["exact_duplicate"] += len(items) - len(new_ids) - near
+    return [(doc_id, request_id) for doc_id, (request_id, _) in zip(doc_ids, items)]
+
+
+@traced("memory.add_to_memory")
+def add_to_memory(request_id: str, text: str, dedup_key: Optional[str] = None) -> None:
+    """
+    Add a text document to the memory vector store for request_id.
+    With dedup enabled the document id is a hash of dedup_key (default: text),
+    so repeated content is embedded once and gains a reference instead.
+    Without dedup an existing id is upserted by adding a suffix.
     """
     try:
-        doc_id = request_id
+        if settings.memory_dedup != "none":
+            record_doc_refs(_ingest([(request_id, text)], [dedup_key or text]))
+            return
         # Avoid duplicate IDs by suffixing if needed
-        existing = collection.get(ids=[doc_id])
-        if existing and existing.get("ids"):
-            doc_id = f"{request_id}:{len(existing['ids'])+1}"
-        collection.add(documents=[text], ids=[doc_id])
+        _embed_and_add([text], _free_ids([request_id]))
     except Exception as e:
         logger.exception("Chroma add_to_memory error: %s", e)
 
 
+@traced("memory.add_many_to_memory")
+def add_many_to_memory(items: Sequence[Tuple[str, str]], dedup_keys: Optional[Sequence[str]] = None) -> None:
+    """
+    Add many (request_id, text) documents with one id lookup and one collection.add.
+    Dedup works as in add_to_memory; without it existing ids are suffixed.
+    """
+    try:
+        record_doc_refs(index_documents(items, dedup_keys))
+    except Exception as e:
+        logger.exception("Chroma add_many_to_memory error: %s", e)
+
+
+@traced("memory.index_documents")
+def index_documents(items: Sequence[Tuple[str, str]], dedup_keys: Optional[Sequence[str]] = None) -> List[Tuple[str, str]]:
+    """
+    The indexing half of add_many_to_memory: returns the (doc_id, request_id)
+    references instead of writing them, so async callers can store them in
+    the same transaction as their own rows (see log_event_async). Raises on
+    failure. Without dedup there are no references.
+    """
+    if not items:
+        return []
+    if settings.memory_dedup != "none":
+        return _ingest(items, dedup_keys or [text for _, text in items])
+    _embed_and_add([text for _, text in items], _free_ids([request_id for request_id, _ in items]))
+    return []
+
+
+@traced("memory.semantic_search")
 def semantic_search(query: str, n_results: int = 3) -> Dict[str, Any]:
     """
     Query the vector store and return top matches.
+    Repeated queries are answered from search_cache until the collection changes.
     """
     try:
-        results = collection.query(query_texts=[query], n_results=n_results)
+        if search_cache is None:
+            with timed("vector_query"):
+                return collection.query(query_texts=[query], n_results=n_results)
+        key = search_key(query, n_results)
+        # Read the generation first: an add racing the query only makes the entry stale
+        generation = collection_generation()
+        cached = search_cache.get(key, generation)
+        if cached is not None:
+            return cached
+        with timed("vector_query"):
+            results = collection.query(query_texts=[query], n_results=n_results)
+        search_cache.set(key, generation, results)
         return results
     except Exception as e:
         logger.exception("Chroma semantic_search error: %s", e)
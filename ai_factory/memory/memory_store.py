@@ -1,25 +1,29 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import os
 from datetime import datetime
-from typing import Iterable, List, Dict, Any
+from typing import Iterable, List, Dict, Any, NamedTuple, Sequence, Tuple
 
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, insert, func
 
-from ai_factory.memory.memory_db import SessionLocal, MemoryEvent, init_db, DATA_DIR
+from ai_factory.memory.memory_db import HAS_ASYNC_DB, async_session, async_write_lock, SessionLocal, MemoryEvent, MemoryDocRef, init_db, DATA_DIR
+from ai_factory.metrics import timed
+from ai_factory.serialization import dumps
+from ai_factory.tracing import traced
 
 # Snapshots directory
 SNAPSHOT_DIR = os.path.join(DATA_DIR, "snapshots")
 
 
+@traced("memory.log_event")
 def log_event(request_id: str, task_type: str, prompt: str, response: str) -> None:
     """
     Append a new planner dispatch event (request+response) to SQLite.
     """
     # Ensure DB is initialized (safe to call repeatedly)
     init_db()
-    with SessionLocal() as session:
+    with timed("sqlite_insert"), SessionLocal() as session:
         evt = MemoryEvent(
             request_id=request_id,
             task_type=task_type,
@@ -30,19 +34,191 @@ def log_event(request_id: str, task_type: str, prompt: str, response: str) -> No
         session.commit()
 
 
+@traced("memory.log_event")
+async def log_event_async(
+    request_id: str, task_type: str, prompt: str, response: str, doc_refs: Sequence[Tuple[str, str]] = ()
+) -> None:
+    """
+    log_event for async callers: awaits aiosqlite instead of blocking the loop.
+    doc_refs (see record_doc_refs) are written in the same transaction.
+    """
+    event = {"request_id": request_id, "task_type": task_type, "prompt": prompt, "response": response}
+    await _write_async([event], doc_refs)
+
+
+@traced("memory.log_events")
+def log_events(events: Iterable[Dict[str, str]]) -> None:
+    """
+    Append many events in one transaction (single executemany INSERT).
+    Each event is a dict with request_id, task_type, prompt and response.
+    """
+    rows = [
+        {
+            "request_id": e["request_id"],
+            "task_type": e["task_type"],
+            "prompt": e["prompt"],
+            "response": e["response"],
+            "timestamp": datetime.utcnow(),
+        }
+        for e in events
+    ]
+    if not rows:
+        return
+    init_db()
+    with timed("sqlite_insert"), SessionLocal() as session:
+        session.execute(insert(MemoryEvent), rows)
+        session.commit()
+
+
+@traced("memory.log_events")
+async def log_events_async(events: Iterable[Dict[str, str]], doc_refs: Sequence[Tuple[str, str]] = ()) -> None:
+    """log_events for async callers, plus doc_refs in the same transaction."""
+    await _write_async(list(events), doc_refs)
+
+
+def _write(events: List[Dict[str, str]], doc_refs: Sequence[Tuple[str, str]]) -> None:
+    log_events(events)
+    record_doc_refs(doc_refs)
+
+
+async def _write_async(events: List[Dict[str, str]], doc_refs: Sequence[Tuple[str, str]]) -> None:
+    if not events and not doc_refs:
+        return
+    if not HAS_ASYNC_DB:
+        return await asyncio.to_thread(_write, events, doc_refs)
+    now = datetime.utcnow()
+    init_db()
+    async with async_write_lock():
+        with timed("sqlite_insert"):
+            async with async_session() as session:
+                if events:
+                    await session.execute(
+                        insert(MemoryEvent),
+                        [
+                            {
+                                "request_id": e["request_id"],
+                                "task_type": e["task_type"],
+                                "prompt": e["prompt"],
+                                "response": e["response"],
+                                "timestamp": now,
+                            }
+                            for e in events
+                        ],
+                    )
+                if doc_refs:
+                    await session.execute(
+                        insert(MemoryDocRef), [{"doc_id": d, "request_id": r, "created_at": now} for d, r in doc_refs]
+                    )
+                await session.commit()
+
+
+def _recent_stmt(limit: int):
+    return select(MemoryEvent).order_by(desc(MemoryEvent.timestamp)).limit(limit)
+
+
+def _by_request_id_stmt(request_id: str):
+    return select(MemoryEvent).where(MemoryEvent.request_id == request_id).order_by(desc(MemoryEvent.timestamp))
+
+
 def get_recent(limit: int = 10) -> List[MemoryEvent]:
     """
     Return latest events (most recent first).
     """
     with SessionLocal() as session:
-        stmt = select(MemoryEvent).order_by(desc(MemoryEvent.timestamp)).limit(limit)
-        return list(session.scalars(stmt))
+        return list(session.scalars(_recent_stmt(limit)))
+
+
+async def get_recent_async(limit: int = 10) -> List[MemoryEvent]:
+    if not HAS_ASYNC_DB:
+        return await asyncio.to_thread(get_recent, limit)
+    async with async_session() as session:
+        return list(await session.scalars(_recent_stmt(limit)))
+
+
+class EventRow(NamedTuple):
+    id: int
+    request_id: str
+    task_type: str
+    prompt: str
+    timestamp: datetime
+
+
+def _list_events_stmt(limit: int):
+    return (
+        select(MemoryEvent.id, MemoryEvent.request_id, MemoryEvent.task_type, MemoryEvent.prompt, MemoryEvent.timestamp)
+        .order_by(desc(MemoryEvent.timestamp), desc(MemoryEvent.id))
+        .limit(limit)
+    )
+
+
+def list_events(limit: int = 10) -> List[EventRow]:
+    """
+    Latest events for list pages, most recent first. Selects only the listed
+    columns (never the response) and skips ORM object construction.
+    """
+    with SessionLocal() as session:
+        return [EventRow._make(row) for row in session.execute(_list_events_stmt(limit))]
+
+
+async def list_events_async(limit: int = 10) -> List[EventRow]:
+    if not HAS_ASYNC_DB:
+        return await asyncio.to_thread(list_events, limit)
+    async with async_session() as session:
+        return [EventRow._make(row) for row in await session.execute(_list_events_stmt(limit))]
 
 
 def find_by_request_id(request_id: str) -> List[MemoryEvent]:
     with SessionLocal() as session:
-        stmt = select(MemoryEvent).where(MemoryEvent.request_id == request_id).order_by(desc(MemoryEvent.timestamp))
-        return list(session.scalars(stmt))
+        return list(session.scalars(_by_request_id_stmt(request_id)))
+
+
+async def find_by_request_id_async(request_id: str) -> List[MemoryEvent]:
+    if not HAS_ASYNC_DB:
+        return await asyncio.to_thread(find_by_request_id, request_id)
+    async with async_session() as session:
+        return list(await session.scalars(_by_request_id_stmt(request_id)))
+
+
+class DocRefs(NamedTuple):
+    occurrences: int
+    request_ids: List[str]  # most recent first, capped
+
+
+@traced("memory.record_doc_refs")
+def record_doc_refs(refs: Sequence[Tuple[str, str]]) -> None:
+    """Record (doc_id, request_id) occurrences of deduplicated vector documents."""
+    if not refs:
+        return
+    init_db()
+    now = datetime.utcnow()
+    with timed("sqlite_insert"), SessionLocal() as session:
+        session.execute(insert(MemoryDocRef), [{"doc_id": d, "request_id": r, "created_at": now} for d, r in refs])
+        session.commit()
+
+
+def doc_references(doc_ids: Sequence[str], limit: int = 20) -> Dict[str, DocRefs]:
+    """
+    Occurrence count and the latest request_ids (up to limit) per document.
+    Documents without references are absent from the result.
+    """
+    if not doc_ids:
+        return {}
+    ranked = (
+        select(
+            MemoryDocRef.doc_id,
+            MemoryDocRef.request_id,
+            func.row_number().over(partition_by=MemoryDocRef.doc_id, order_by=desc(MemoryDocRef.id)).label("rn"),
+            func.count().over(partition_by=MemoryDocRef.doc_id).label("n"),
+        )
+        .where(MemoryDocRef.doc_id.in_(list(doc_ids)))
+        .subquery()
+    )
+    stmt = select(ranked.c.doc_id, ranked.c.request_id, ranked.c.n).where(ranked.c.rn <= limit).order_by(ranked.c.doc_id, ranked.c.rn)
+    out: Dict[str, DocRefs] = {}
+    with SessionLocal() as session:
+        for doc_id, request_id, n in session.execute(stmt):
+            out.setdefault(doc_id, DocRefs(n, [])).request_ids.append(request_id)
+    return out
 
 
 def create_snapshot(limit: int = 100) -> str:
@@ -65,7 +241,6 @@ def create_snapshot(limit: int = 100) -> str:
             "response": e.response,
         })
 
-    with open(path, "w", encoding="utf-8") as f:
-        for r in records:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    with open(path, "wb") as f:
+        f.write(b"".join(dumps(r) + b"\n" for r in records))
     return path
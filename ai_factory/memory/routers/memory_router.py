@@ -1,15 +1,16 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Query
-from ai_factory.memory.memory_store import get_recent, create_snapshot
+from ai_factory.memory.memory_store import list_events_async, create_snapshot, doc_references
+from ai_factory.memory import memory_embeddings
 from ai_factory.memory.memory_embeddings import semantic_search
 
 router = APIRouter(prefix="/memory", tags=["memory"])
 
 
 @router.get("/logs")
-def read_logs(limit: int = Query(10, ge=1, le=500)):
-    events = get_recent(limit)
+async def read_logs(limit: int = Query(10, ge=1, le=500)):
+    events = await list_events_async(limit)
     return [
         {
             "id": e.id,
@@ -30,11 +31,30 @@ def search_memory(q: str = Query(..., min_length=1), n: int = Query(3, ge=1, le=
     ids = results.get("ids", [[]])[0] if results else []
     docs = results.get("documents", [[]])[0] if results else []
     dists = results.get("distances", [[]])[0] if results else []
+    # Deduplicated documents expand to the requests that produced them; "id"
+    # stays a request id (the latest one) so hits still join to /memory/logs
+    refs = doc_references(ids)
     for i, doc_id in enumerate(ids):
-        hits.append({"id": doc_id, "text": docs[i] if i < len(docs) else None, "distance": dists[i] if i < len(dists) else None})
+        ref = refs.get(doc_id)
+        hits.append({
+            "id": ref.request_ids[0] if ref else doc_id,
+            "doc_id": doc_id,
+            "text": docs[i] if i < len(docs) else None,
+            "distance": dists[i] if i < len(dists) else None,
+            "request_ids": ref.request_ids if ref else [doc_id],
+            "occurrences": ref.occurrences if ref else 1,
+        })
     return {"query": q, "results": hits}
 
 
+@router.get("/search/cache/stats", summary="Memory search result cache statistics")
+def search_cache_stats():
+    cache = memory_embeddings.search_cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "generation": memory_embeddings.collection_generation(), **cache.stats()}
+
+
 @router.get("/snapshot")
 def snapshot(limit: int = Query(100, ge=1, le=2000)):
     path = create_snapshot(limit=limit)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Tuple
+
+from ai_factory.cache import LRUTTLCache
+
+SearchKey = Tuple[str, int]
+
+
+def search_key(query: str, n_results: int) -> SearchKey:
+    """Cache key over the whitespace-normalized query and result count."""
+    return " ".join(query.split()), int(n_results)
+
+
+def _copy_results(results: Dict[str, Any]) -> Dict[str, Any]:
+    # Chroma results are dicts of per-query lists; copy them so callers can't
+    # mutate what the cache holds
+    return {k: [list(row) for row in v] if isinstance(v, list) else v for k, v in results.items()}
+
+
+class SearchResultCache:
+    """
+    LRU + TTL cache for semantic_search results. Every entry is tagged with the
+    collection generation it was computed at; a lookup at a newer generation
+    (i.e. after any add) is a miss, so results never lag behind writes.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 60.0):
+        self._lru: LRUTTLCache[Tuple[int, Dict[str, Any]]] = LRUTTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, key: SearchKey, generation: int) -> Optional[Dict[str, Any]]:
+        entry = self._lru.get(key)
+        if entry is not None and entry[0] != generation:
+            self.stale += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _copy_results(entry[1])
+
+    def set(self, key: SearchKey, generation: int, results: Dict[str, Any]) -> None:
+        self._lru.set(key, (generation, _copy_results(results)))
+
+    def clear(self) -> None:
+        self._lru.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "memory": self._lru.stats(),
+        }
@@ -0,0 +1,414 @@
+"""
+Quantized vector store for the memory collection.
+
+Vectors are L2-normalized (cosine similarity becomes a dot product) and kept
+in RAM as either:
+  - float16: half the size of float32, near-lossless for ranking;
+  - int8: a quarter of the size, scalar-quantized per dimension as
+    x[d] ~= offset[d] + scale[d] * (code[d] + 128), with the per-dimension
+    ranges calibrated from the data seen so far.
+
+Everything else stays on disk. search() scans the quantized codes in blocks,
+keeps the best k * rerank candidates, and optionally re-scores them exactly
+in float32 by reading only those rows back.
+
+With a path, the store persists itself in that directory and reopens from it:
+  meta.json        vector dim and which dtype the codes file holds
+  ids.jsonl        ids in row order
+  vectors.f32      the exact float32 rows (re-rank, int8 calibration)
+  codes.<dtype>    the quantized rows, read back at startup
+  int8.npy         int8 offset and scale
+  documents.jsonl  QuantizedCollection's documents; only offsets are in RAM
+Without a path the same data lives in unlinked scratch files.
+
+Chroma is not used for storage here: it keeps its own float32 copy of every
+vector in RAM (the HNSW index), which would cost more than no quantization.
+QuantizedCollection.import_from() copies an existing collection in once.
+
+numpy is optional here (it ships with sentence-transformers); without it the
+app falls back to the unquantized collection.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import IO, Any, Dict, Iterator, List, Literal, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None  # type: ignore[assignment]
+    HAS_NUMPY = False
+
+logger = logging.getLogger(__name__)
+
+Quantization = Literal["float32", "float16", "int8"]
+
+# Rows converted to float32 per step of a scan; small blocks stay in cache
+_SCAN_BLOCK = 1024
+# int8 ranges are re-fitted whenever the index doubles, up to this size
+_CALIBRATE_UNTIL = 1 << 16
+# float32 rows read per step when re-encoding at startup
+_LOAD_BLOCK = 1 << 14
+
+
+def _open_rw(path: str) -> IO[bytes]:
+    return open(path, "r+b" if os.path.exists(path) else "w+b")
+
+
+def _read_lines(f: IO[bytes]) -> Iterator[Tuple[int, bytes]]:
+    """(offset, line) for each complete line; a torn last line (crash mid-append) is cut off."""
+    f.seek(0)
+    offset = 0
+    for line in f:
+        if not line.endswith(b"\n"):
+            f.truncate(offset)
+            break
+        yield offset, line
+        offset += len(line)
+    f.seek(0, os.SEEK_END)
+
+
+class QuantizedVectorIndex:
+    """
+    Append/upsert-only vector index with quantized storage and exact re-rank.
+    Thread-safe; dim is taken from the first add().
+    """
+
+    def __init__(
+        self,
+        dtype: Quantization = "int8",
+        dim: Optional[int] = None,
+        scratch_dir: Optional[str] = None,
+        path: Optional[str] = None,
+    ):
+        if not HAS_NUMPY:
+            raise RuntimeError("QuantizedVectorIndex requires numpy")
+        if dtype not in ("float32", "float16", "int8"):
+            raise ValueError(f"unknown quantization: {dtype!r}")
+        self.dtype = dtype
+        self.dim = dim
+        self.path = path
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._codes: Any = None
+        self._scale: Any = None
+        self._offset: Any = None
+        self._calibrated_at = 0
+        self._lock = threading.RLock()
+        self._ids_file: Optional[IO[bytes]] = None
+        self._codes_file: Optional[IO[bytes]] = None
+        if path is None:
+            # Exact float32 rows, for re-rank and int8 re-calibration
+            self._raw = tempfile.TemporaryFile(dir=scratch_dir)
+            return
+        os.makedirs(path, exist_ok=True)
+        self._raw = _open_rw(os.path.join(path, "vectors.f32"))
+        self._codes_file = _open_rw(os.path.join(path, f"codes.{dtype}"))
+        self._ids_file = _open_rw(os.path.join(path, "ids.jsonl"))
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    # ---- storage ----
+
+    def _ensure_capacity(self, n: int, used: int) -> None:
+        storage = np.float16 if self.dtype == "float16" else np.int8 if self.dtype == "int8" else np.float32
+        if self._codes is None:
+            self._codes = np.zeros((max(n, 1024), self.dim), dtype=storage)
+        elif n > self._codes.shape[0]:
+            grown = np.zeros((max(n, 2 * self._codes.shape[0]), self.dim), dtype=storage)
+            grown[:used] = self._codes[:used]
+            self._codes = grown
+
+    def _encode(self, vectors: "np.ndarray") -> "np.ndarray":
+        if self.dtype == "int8":
+            codes = np.rint((vectors - self._offset) / self._scale) - 128
+            return np.clip(codes, -128, 127).astype(np.int8)
+        return vectors.astype(self._codes.dtype)
+
+    def _fit_int8(self, lo: "np.ndarray", hi: "np.ndarray") -> None:
+        self._offset = lo.astype(np.float32)
+        self._scale = np.maximum((hi - lo) / 255.0, 1e-8).astype(np.float32)
+        if self.path is not None:
+            tmp = os.path.join(self.path, "int8.npy.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, np.stack([self._offset, self._scale]))
+            os.replace(tmp, os.path.join(self.path, "int8.npy"))
+
+    def _read_raw(self, rows: "np.ndarray") -> "np.ndarray":
+        width = self.dim * 4
+        fd = self._raw.fileno()
+        buf = b"".join(os.pread(fd, width, int(r) * width) for r in rows)
+        return np.frombuffer(buf, dtype=np.float32).reshape(len(rows), self.dim)
+
+    def _read_all_raw(self) -> "np.ndarray":
+        self._raw.flush()
+        width = self.dim * 4
+        buf = os.pread(self._raw.fileno(), width * len(self._ids), 0)
+        return np.frombuffer(buf, dtype=np.float32).reshape(len(self._ids), self.dim)
+
+    def _raw_blocks(self) -> Iterator[Tuple[int, "np.ndarray"]]:
+        width = self.dim * 4
+        for start in range(0, len(self._ids), _LOAD_BLOCK):
+            count = min(_LOAD_BLOCK, len(self._ids) - start)
+            buf = os.pread(self._raw.fileno(), width * count, start * width)
+            yield start, np.frombuffer(buf, dtype=np.float32).reshape(count, self.dim)
+
+    def _write_codes(self, rows: Optional["np.ndarray"] = None) -> None:
+        """Mirror the given code rows (default: all) to the codes file."""
+        if self._codes_file is None:
+            return
+        fd = self._codes_file.fileno()
+        width = self.dim * self._codes.itemsize
+        if rows is None:
+            os.pwrite(fd, self._codes[: len(self._ids)].tobytes(), 0)
+            return
+        for row in rows:
+            os.pwrite(fd, self._codes[int(row)].tobytes(), int(row) * width)
+
+    def _write_meta(self) -> None:
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "codes": self.dtype}, f)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    def _load(self) -> None:
+        """Reopen a persisted store: ids and codes into RAM, float32 rows stay on disk."""
+        try:
+            with open(os.path.join(self.path, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return
+        if self.dim is not None and self.dim != meta["dim"]:
+            raise ValueError(f"stored vector dim {meta['dim']} != index dim {self.dim}")
+        self.dim = int(meta["dim"])
+        ids = [json.loads(line) for _, line in _read_lines(self._ids_file)]
+        # Rows are written before their id, so a crash leaves at most extra rows
+        ids = ids[: os.fstat(self._raw.fileno()).st_size // (self.dim * 4)]
+        self._ids = ids
+        self._rows = {_id: row for row, _id in enumerate(ids)}
+        n = len(ids)
+        if not n:
+            if meta.get("codes") != self.dtype:
+                self._write_meta()
+            return
+        self._ensure_capacity(n, 0)
+        size = n * self.dim * self._codes.itemsize
+        reusable = (
+            meta.get("codes") == self.dtype
+            and os.fstat(self._codes_file.fileno()).st_size >= size
+            # Below _CALIBRATE_UNTIL the int8 ranges may have been mid-refit; re-fitting is cheap there
+            and (self.dtype != "int8" or n > _CALIBRATE_UNTIL)
+        )
+        if reusable:
+            codes = np.frombuffer(os.pread(self._codes_file.fileno(), size, 0), dtype=self._codes.dtype)
+            self._codes[:n] = codes.reshape(n, self.dim)
+            if self.dtype == "int8":
+                self._offset, self._scale = np.load(os.path.join(self.path, "int8.npy"))
+                self._calibrated_at = n
+            return
+        if self.dtype == "int8":
+            lo = np.full(self.dim, np.inf, dtype=np.float32)
+            hi = np.full(self.dim, -np.inf, dtype=np.float32)
+            for _, block in self._raw_blocks():
+                lo = np.minimum(lo, block.min(axis=0))
+                hi = np.maximum(hi, block.max(axis=0))
+            self._fit_int8(lo, hi)
+            self._calibrated_at = n
+        for start, block in self._raw_blocks():
+            self._codes[start : start + len(block)] = self._encode(block)
+        self._write_codes()
+        self._write_meta()
+
+    def add(self, ids: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        if not ids:
+            return
+        mat = np.asarray(vectors, dtype=np.float32)
+        if mat.ndim != 2 or mat.shape[0] != len(ids):
+            raise ValueError("expected one vector per id")
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(mat.shape[1])
+                if self.path is not None:
+                    self._write_meta()
+            elif mat.shape[1] != self.dim:
+                raise ValueError(f"vector dim {mat.shape[1]} != index dim {self.dim}")
+            norms = np.linalg.norm(mat, axis=1, keepdims=True)
+            mat = mat / np.where(norms == 0, 1.0, norms)
+
+            used = len(self._ids)
+            rows = np.empty(len(ids), dtype=np.int64)
+            new_ids: List[str] = []
+            for i, _id in enumerate(ids):
+                row = self._rows.get(_id)
+                if row is None:
+                    row = len(self._ids)
+                    self._rows[_id] = row
+                    self._ids.append(_id)
+                    new_ids.append(_id)
+                rows[i] = row
+            self._ensure_capacity(len(self._ids), used)
+
+            width = self.dim * 4
+            fd = self._raw.fileno()
+            for row, vec in zip(rows, mat):
+                os.pwrite(fd, vec.tobytes(), int(row) * width)
+
+            n = len(self._ids)
+            if self.dtype == "int8" and (self._offset is None or _CALIBRATE_UNTIL >= n >= 2 * self._calibrated_at):
+                # Early on the ranges are still moving: re-fit and re-encode everything
+                raw = self._read_all_raw()
+                self._fit_int8(raw.min(axis=0), raw.max(axis=0))
+                self._codes[:n] = self._encode(raw)
+                self._calibrated_at = n
+                self._write_codes()
+            else:
+                self._codes[rows] = self._encode(mat)
+                self._write_codes(rows)
+            if self._ids_file is not None and new_ids:
+                self._ids_file.write("".join(json.dumps(_id) + "\n" for _id in new_ids).encode("utf-8"))
+                self._ids_file.flush()
+
+    # ---- search ----
+
+    def _scan(self, query: "np.ndarray") -> "np.ndarray":
+        n = len(self._ids)
+        if self.dtype == "int8":
+            # sum_d (offset_d + scale_d * (code_d + 128)) * q_d
+            weights = self._scale * query
+            bias = float(np.dot(self._offset, query) + 128.0 * weights.sum())
+        else:
+            weights, bias = query, 0.0
+        scores = np.empty(n, dtype=np.float32)
+        for start in range(0, n, _SCAN_BLOCK):
+            block = self._codes[start : min(start + _SCAN_BLOCK, n)]
+            scores[start : start + len(block)] = block.astype(np.float32, copy=False) @ weights
+        return scores + bias
+
+    def search(self, vector: Sequence[float], k: int = 3, rerank: int = 4) -> Tuple[List[str], List[float]]:
+        """
+        Return (ids, cosine distances) of the k nearest vectors. With rerank > 0
+        the top k * rerank quantized candidates are re-scored in float32.
+        """
+        with self._lock:
+            n = len(self._ids)
+            if n == 0 or k <= 0:
+                return [], []
+            query = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(query)
+            if norm:
+                query = query / norm
+            scores = self._scan(query)
+            pool = min(n, k * rerank if rerank > 0 and self.dtype != "float32" else k)
+            cand = np.argpartition(-scores, pool - 1)[:pool] if pool < n else np.arange(n)
+            if rerank > 0 and self.dtype != "float32":
+                cand_scores = self._read_raw(cand) @ query
+            else:
+                cand_scores = scores[cand]
+            order = np.argsort(-cand_scores, kind="stable")[:k]
+            return [self._ids[int(cand[i])] for i in order], [float(1.0 - cand_scores[i]) for i in order]
+
+    def nbytes(self) -> int:
+        """RAM held by the quantized codes and quantization parameters."""
+        if self._codes is None:
+            return 0
+        used = len(self._ids) * self.dim * self._codes.itemsize
+        if self.dtype == "int8":
+            used += self._scale.nbytes + self._offset.nbytes
+        return used
+
+    def stats(self) -> Dict[str, Any]:
+        return {"dtype": self.dtype, "dim": self.dim, "count": len(self._ids), "bytes": self.nbytes()}
+
+    def close(self) -> None:
+        for f in (self._raw, self._codes_file, self._ids_file):
+            if f is not None:
+                f.close()
+
+
+class QuantizedCollection:
+    """
+    Memory collection served from a QuantizedVectorIndex, with the documents
+    in a file next to it (only their offsets are kept in RAM). Exposes the
+    add/get/count/query surface of a Chroma collection; query() embeds the
+    query text and searches the index, returning the usual Chroma-shaped
+    result dict.
+    """
+
+    def __init__(self, index: QuantizedVectorIndex, embedding_function: Any, rerank: int = 4, path: Optional[str] = None):
+        self.index = index
+        self.embedding_function = embedding_function
+        self.rerank = rerank
+        self._lock = threading.Lock()
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        if path is None:
+            self._documents = tempfile.TemporaryFile()
+            return
+        os.makedirs(path, exist_ok=True)
+        self._documents = _open_rw(os.path.join(path, "documents.jsonl"))
+        for offset, line in _read_lines(self._documents):
+            _id, _ = json.loads(line)
+            self._offsets[_id] = (offset, len(line))
+
+    def add(self, documents: List[str], ids: List[str], embeddings: Optional[List[List[float]]] = None, metadatas=None) -> None:
+        if embeddings is None:
+            embeddings = self.embedding_function(documents)
+        self.index.add(ids, embeddings)
+        lines = [json.dumps([_id, doc]).encode("utf-8") + b"\n" for _id, doc in zip(ids, documents)]
+        with self._lock:
+            offset = self._documents.seek(0, os.SEEK_END)
+            self._documents.write(b"".join(lines))
+            self._documents.flush()
+            for _id, line in zip(ids, lines):
+                self._offsets[_id] = (offset, len(line))
+                offset += len(line)
+
+    def import_from(self, collection: Any, page: int = 1024) -> int:
+        """Copy every document (and its stored vector, if any) from a Chroma collection; returns how many."""
+        copied = 0
+        while True:
+            found = collection.get(limit=page, offset=copied, include=["documents", "embeddings"])
+            ids = found.get("ids") or []
+            if not ids:
+                return copied
+            docs = found["documents"]
+            vectors = found.get("embeddings")
+            if vectors is None or any(v is None for v in vectors):
+                vectors = self.embedding_function(docs)
+            self.add(documents=docs, ids=ids, embeddings=[list(v) for v in vectors])
+            copied += len(ids)
+
+    def get(self, ids: List[str]) -> Dict[str, Any]:
+        fd = self._documents.fileno()
+        with self._lock:
+            spans = [(_id, self._offsets[_id]) for _id in ids if _id in self._offsets]
+        docs = [json.loads(os.pread(fd, length, offset))[1] for _, (offset, length) in spans]
+        return {"ids": [_id for _id, _ in spans], "documents": docs}
+
+    def count(self) -> int:
+        return len(self._offsets)
+
+    def query(self, query_texts: List[str], n_results: int = 3) -> Dict[str, Any]:
+        vectors = self.embedding_function(query_texts)
+        results_ids: List[List[str]] = []
+        results_docs: List[List[str]] = []
+        results_dists: List[List[float]] = []
+        for vec in vectors:
+            ids, dists = self.index.search(vec, n_results, rerank=self.rerank)
+            found = self.get(ids)
+            docs = dict(zip(found["ids"], found["documents"]))
+            results_ids.append(ids)
+            results_docs.append([docs.get(_id) for _id in ids])
+            results_dists.append(dists)
+        return {"ids": results_ids, "documents": results_docs, "distances": results_dists}
+
+    def close(self) -> None:
+        self.index.close()
+        self._documents.close()
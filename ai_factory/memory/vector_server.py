@@ -0,0 +1,251 @@
+"""
+Single-owner vector store for multi-worker deployments.
+
+With several uvicorn workers each process would otherwise hold its own
+in-memory collection, so search results would depend on which worker answered.
+In "shared" mode one process owns the collection and serves it over a Unix
+socket; workers embed locally and talk to it through RemoteCollection, which
+exposes the same add/get/query/count surface as a local collection, plus
+generation(): a counter bumped on every add, which workers use to invalidate
+their search result caches.
+
+Wire format: 4-byte big-endian length + JSON object, one request/response pair
+per frame. Requests are {"op": ..., "kwargs": {...}}; responses are
+{"ok": true, "result": ...} or {"ok": false, "error": "..."}.
+
+Run standalone with: python -m ai_factory.memory.vector_server --socket PATH
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import struct
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ai_factory.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), "ai_factory_vector.sock")
+
+_HEADER = struct.Struct(">I")
+_OPS = frozenset({"add", "get", "query", "count", "generation"})
+# Safe to resend after a failure mid-request; "add" would be applied twice
+_READ_OPS = frozenset({"get", "query", "count", "generation"})
+
+
+class VectorServerError(RuntimeError):
+    """Raised on the client when the vector server rejects or fails a request."""
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("vector server connection closed")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def send_frame(sock: socket.socket, payload: Any) -> None:
+    body = dumps(payload)
+    sock.sendall(_HEADER.pack(len(body)) + body)
+
+
+def recv_frame(sock: socket.socket) -> Any:
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return json.loads(_recv_exact(sock, size))
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    server: "VectorServer"
+
+    def handle(self) -> None:
+        # Connections are persistent: serve frames until the client hangs up
+        while True:
+            try:
+                request = recv_frame(self.request)
+            except (ConnectionError, OSError):
+                return
+            send_frame(self.request, self.server.dispatch(request))
+
+
+class VectorServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Owns one collection and serializes access to it. Reads and writes share a
+    lock because the underlying collection is not thread-safe.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, path: str, collection: Any):
+        if os.path.exists(path):
+            os.unlink(path)
+        self.path = path
+        self.collection = collection
+        self.generation = 0
+        self._lock = threading.Lock()
+        super().__init__(path, _Handler)
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op")
+        if op not in _OPS:
+            return {"ok": False, "error": f"unknown op: {op!r}"}
+        try:
+            with self._lock:
+                if op == "generation":
+                    return {"ok": True, "result": self.generation}
+                result = getattr(self.collection, op)(**(request.get("kwargs") or {}))
+                if op == "add":
+                    self.generation += 1
+            return {"ok": True, "result": result}
+        except Exception as e:
+            logger.exception("Vector server %s failed", op)
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class RemoteCollection:
+    """
+    Client for VectorServer. One persistent connection per thread. Read ops
+    that hit a dropped connection are retried once on a fresh one; writes are
+    never resent, but a connection the server already closed is detected and
+    replaced before a write goes out.
+    """
+
+    def __init__(self, path: str = DEFAULT_SOCKET_PATH, timeout: float = 10.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        self._local.sock = sock
+        return sock
+
+    def _close(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                sock.close()
+            finally:
+                self._local.sock = None
+
+    def _open_socket(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is not None and not _peer_open(sock):
+            self._close()
+            sock = None
+        return sock or self._connect()
+
+    def _call(self, op: str, **kwargs: Any) -> Any:
+        request = {"op": op, "kwargs": kwargs}
+        attempts = 2 if op in _READ_OPS else 1
+        for attempt in range(1, attempts + 1):
+            sock = self._open_socket()
+            try:
+                send_frame(sock, request)
+                response = recv_frame(sock)
+                break
+            except (ConnectionError, OSError):
+                self._close()
+                if attempt == attempts:
+                    raise
+        if not response.get("ok"):
+            raise VectorServerError(response.get("error", "vector server error"))
+        return response.get("result")
+
+    def add(self, documents: List[str], ids: List[str], embeddings: Optional[List[List[float]]] = None, metadatas=None) -> None:
+        self._call("add", documents=documents, ids=ids, embeddings=embeddings, metadatas=metadatas)
+
+    def get(self, ids: List[str]) -> Dict[str, Any]:
+        return self._call("get", ids=ids)
+
+    def query(self, query_texts: List[str], n_results: int = 3) -> Dict[str, Any]:
+        return self._call("query", query_texts=query_texts, n_results=n_results)
+
+    def count(self) -> int:
+        return int(self._call("count"))
+
+    def generation(self) -> int:
+        return int(self._call("generation"))
+
+    def close(self) -> None:
+        self._close()
+
+
+def _peer_open(sock: socket.socket) -> bool:
+    """False if the server has closed this idle connection (EOF is readable)."""
+    try:
+        return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) != b""
+    except BlockingIOError:
+        return True
+    except OSError:
+        return False
+
+
+def wait_for_socket(path: str, timeout: float = 10.0) -> None:
+    """Block until a VectorServer answers on path (used by the launcher)."""
+    deadline = time.monotonic() + timeout
+    probe = RemoteCollection(path, timeout=1.0)
+    while True:
+        try:
+            probe.count()
+            probe.close()
+            return
+        except (OSError, VectorServerError):
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"vector server did not come up on {path}")
+            time.sleep(0.05)
+
+
+def serve(path: str = DEFAULT_SOCKET_PATH) -> None:
+    from ai_factory.config import settings
+
+    if settings.vector_store_mode != "local":
+        raise RuntimeError("the vector server owns the collection; run it with VECTOR_STORE_MODE=local")
+    # Importing memory_embeddings opens the collection; serve that one rather than a second copy
+    from ai_factory.memory.memory_embeddings import collection
+
+    server = VectorServer(path, collection)
+    logger.info("Vector server listening on %s", path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve the memory vector collection over a Unix socket.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+    # Exit through serve()'s finally so the socket file is removed
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        serve(args.socket)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelValues = Tuple[str, ...]
+GaugeValue = Union[float, Dict[LabelValues, float]]
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    return "+Inf" if v == float("inf") else repr(float(v))
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram with label support (Prometheus semantics)."""
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        # Per-bucket (non-cumulative) counts, then sum and count in the last two slots
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0.0] * (len(self.buckets) + 3)
+            series[idx] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            running = 0.0
+            for i, bound in enumerate(self.buckets + (float("inf"),)):
+                running += series[i]
+                le = f'le="{_fmt_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.label_names, labels, le)} {int(running)}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.label_names, labels)} {series[-2]!r}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.label_names, labels)} {int(series[-1])}")
+        return lines
+
+
+class Gauge:
+    """Gauge whose value is read from a callback at scrape time."""
+
+    def __init__(self, name: str, help: str, fn: Callable[[], GaugeValue], label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.label_names = tuple(label_names)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        try:
+            value = self.fn()
+        except Exception:
+            logger.exception("Gauge %s callback failed", self.name)
+            return lines
+        if isinstance(value, dict):
+            for labels, v in sorted(value.items()):
+                lines.append(f"{self.name}{_fmt_labels(self.label_names, labels)} {_fmt_value(v)}")
+        else:
+            lines.append(f"{self.name} {_fmt_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Union[Histogram, Gauge]] = {}
+
+    def histogram(self, name: str, help: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = Histogram(name, help, label_names, buckets)
+        return metric  # type: ignore[return-value]
+
+    def gauge(self, name: str, help: str, fn: Callable[[], GaugeValue], label_names: Sequence[str] = ()) -> Gauge:
+        # Re-registering replaces the callback (e.g. after a module reload)
+        metric = self._metrics[name] = Gauge(name, help, fn, label_names)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_LATENCY = registry.histogram(
+    "ai_factory_stage_latency_seconds",
+    "Latency of internal processing stages.",
+    label_names=("stage",),
+)
+
+
+class timed:
+    """
+    Record the wall time of a block or function into the stage latency histogram.
+
+        with timed("sqlite_insert"):
+            ...
+
+        @timed("planner_compute")
+        def plan(...): ...
+    """
+
+    __slots__ = ("stage", "_t0")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._t0: Optional[float] = None
+
+    def __enter__(self) -> "timed":
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        STAGE_LATENCY.observe(time.perf_counter() - self._t0, self.stage)  # type: ignore[operator]
+
+    def __call__(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        stage = self.stage
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                t0 = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    STAGE_LATENCY.observe(time.perf_counter() - t0, stage)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                STAGE_LATENCY.observe(time.perf_counter() - t0, stage)
+
+        return wrapper
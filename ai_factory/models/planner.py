@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field, field_validator
 from typing import List, Literal, Optional
 from datetime import datetime, timezone
-from uuid import uuid4
+
+from ai_factory.tracing import new_request_id
 
 TaskType = Literal["general", "coding", "research", "planning"]
 
@@ -43,7 +44,7 @@ class DispatchResponse(BaseModel):
         notes: Optional[str] = None,
     ) -> "DispatchResponse":
         return cls(
-            request_id=str(uuid4()),
+            request_id=new_request_id(),
             created_at=datetime.now(timezone.utc),
             task_type=task_type,
             steps=steps,
@@ -1,24 +1,84 @@
+import asyncio
 import logging
-from fastapi import APIRouter, HTTPException
+from typing import List
+from fastapi import APIRouter, HTTPException, Request
+from ai_factory.config import settings
 from ai_factory.models import DispatchRequest, DispatchResponse, ErrorResponse
+from ai_factory.serialization import ModelJSONResponse
+from ai_factory.services.planner_records import PlannerRecord, remember_planner_output
+from ai_factory.services.planner_backends import dispatcher
 from ai_factory.services.planner_service import planner
+from ai_factory.tracing import current_trace_id
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/planner", tags=["planner"])
 
 
 @router.post("/dispatch", response_model=DispatchResponse, responses={400: {"model": ErrorResponse}})
-def dispatch(req: DispatchRequest) -> DispatchResponse:
+async def dispatch(req: DispatchRequest, request: Request):
     """
-    Accepts a prompt and task_type and returns a structured plan (stubbed).
+    Accepts a prompt and task_type and returns a structured plan from the backend routed for task_type.
     """
     try:
         logger.debug("Dispatch received: %s", req.model_dump())
-        resp = planner.plan(req.prompt, req.task_type)
-        return resp
+        resp = await dispatcher.dispatch(req.prompt, req.task_type)
+        # Serialize once in pydantic-core; the memory logger reuses these bytes
+        out = ModelJSONResponse(resp)
+        remember_planner_output(request, [PlannerRecord(resp.request_id, req.task_type, req.prompt, out.items[0])])
+        return out
+    except asyncio.TimeoutError:
+        logger.warning("Planner backend timed out: task_type=%s", req.task_type)
+        raise HTTPException(status_code=504, detail="Planner backend timed out")
     except ValueError as ve:
         logger.exception("Validation error")
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         logger.exception("Unexpected error in dispatch")
         raise HTTPException(status_code=500, detail="Internal planner error")
+
+
+@router.post("/dispatch_batch", response_model=List[DispatchResponse], responses={400: {"model": ErrorResponse}})
+async def dispatch_batch(reqs: List[DispatchRequest], request: Request):
+    """
+    Accepts a list of dispatch requests and returns one plan per request, in order.
+    """
+    if not reqs:
+        raise HTTPException(status_code=400, detail="batch must not be empty")
+    if len(reqs) > settings.planner_batch_max_size:
+        raise HTTPException(status_code=400, detail=f"batch exceeds {settings.planner_batch_max_size} requests")
+    try:
+        logger.debug("Batch dispatch received: size=%d", len(reqs))
+        resps = await dispatcher.dispatch_many([(r.prompt, r.task_type) for r in reqs])
+        trace_id = current_trace_id()
+        if trace_id:
+            # One trace per batch; items are addressable as <trace_id>:<index>
+            for i, resp in enumerate(resps):
+                resp.request_id = f"{trace_id}:{i}"
+        out = ModelJSONResponse(resps)
+        remember_planner_output(
+            request,
+            [PlannerRecord(resp.request_id, r.task_type, r.prompt, body) for r, resp, body in zip(reqs, resps, out.items)],
+        )
+        return out
+    except asyncio.TimeoutError:
+        logger.warning("Planner backend timed out on batch of %d", len(reqs))
+        raise HTTPException(status_code=504, detail="Planner backend timed out")
+    except ValueError as ve:
+        logger.exception("Validation error")
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception:
+        logger.exception("Unexpected error in batch dispatch")
+        raise HTTPException(status_code=500, detail="Internal planner error")
+
+
+@router.get("/cache/stats", summary="Planner response cache statistics")
+def cache_stats():
+    stats = getattr(planner, "stats", None)
+    if stats is None:
+        return {"enabled": False}
+    return {"enabled": True, **stats()}
+
+
+@router.get("/backends", summary="Planner backend routing and concurrency statistics")
+def backend_stats():
+    return dispatcher.stats()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+from datetime import date, datetime, time
+from enum import Enum
+from functools import lru_cache
+from typing import Any, List
+
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import JSONResponse, Response
+
+try:  # optional fast path
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None  # type: ignore[assignment]
+
+HAS_ORJSON = orjson is not None
+
+
+def _default(obj: Any) -> Any:
+    """
+    Fallback for types JSON lacks, shared by both backends so they agree:
+    the stdlib path mirrors what orjson does natively (ISO datetimes, UUID
+    strings, enum values), and anything else becomes str(obj).
+    """
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON bytes (orjson when available, stdlib json otherwise)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def _adapter(model_type: type) -> TypeAdapter:
+    return TypeAdapter(model_type)
+
+
+def model_json(model: BaseModel) -> bytes:
+    """Serialize a Pydantic model straight to JSON bytes in pydantic-core."""
+    return _adapter(type(model)).dump_json(model)
+
+
+class FastJSONResponse(JSONResponse):
+    """App-wide default response class backed by orjson when installed."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class ModelJSONResponse(Response):
+    """
+    Response for already-validated Pydantic models (or lists of them).
+    Bypasses jsonable_encoder; each item is serialized once and the per-item
+    bytes are kept on `.items` so callers can reuse them (e.g. for logging).
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content: Any, status_code: int = 200, **kwargs: Any):
+        if isinstance(content, BaseModel):
+            self.items: List[bytes] = [model_json(content)]
+            body = self.items[0]
+        else:
+            self.items = [model_json(m) for m in content]
+            body = b"[" + b",".join(self.items) + b"]"
+        super().__init__(content=body, status_code=status_code, **kwargs)
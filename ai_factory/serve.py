@@ -0,0 +1,82 @@
+"""
+Production launcher: python -m ai_factory.serve [--workers N]
+
+With one worker this is plain uvicorn. With several, it first starts the
+vector server (the single owner of the memory collection), waits for its
+socket, and then runs uvicorn workers in "shared" vector-store mode so every
+worker reads and writes the same collection. SQLite is shared through WAL;
+the launcher creates the schema before any worker starts. MinHash ingest
+dedup is per process, so it is refused with several workers.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import subprocess
+import sys
+from typing import List, Optional
+
+from ai_factory.config import settings
+from ai_factory.memory.memory_db import init_db
+from ai_factory.memory.vector_server import DEFAULT_SOCKET_PATH, wait_for_socket
+
+logger = logging.getLogger(__name__)
+
+
+def start_vector_server(path: str) -> subprocess.Popen:
+    # The owner process always holds the collection locally
+    env = dict(os.environ, VECTOR_STORE_MODE="local")
+    proc = subprocess.Popen([sys.executable, "-m", "ai_factory.memory.vector_server", "--socket", path], env=env)
+    try:
+        wait_for_socket(path)
+    except TimeoutError:
+        proc.kill()
+        raise
+    return proc
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run AI Factory with one or more uvicorn workers.")
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument("--workers", type=int, default=settings.workers)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=settings.log_level, format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+
+    if args.workers > 1 and settings.memory_dedup == "minhash":
+        # The MinHash index lives in each worker, so folding would depend on which worker ingested what
+        parser.error("memory_dedup=minhash needs a single worker; use memory_dedup=exact with --workers > 1")
+
+    import uvicorn
+
+    # Create the schema once here: workers starting together would race on create_all
+    init_db()
+
+    vector_proc: Optional[subprocess.Popen] = None
+    if args.workers > 1:
+        path = settings.vector_store_socket or DEFAULT_SOCKET_PATH
+        vector_proc = start_vector_server(path)
+        # Workers are spawned fresh and read their settings from the environment
+        os.environ["VECTOR_STORE_MODE"] = "shared"
+        os.environ["VECTOR_STORE_SOCKET"] = path
+        logger.info("Vector server up on %s; starting %d workers", path, args.workers)
+    try:
+        uvicorn.run(
+            "ai_factory.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            log_level=settings.uvicorn_log_level,
+        )
+    finally:
+        if vector_proc is not None:
+            vector_proc.terminate()
+            try:
+                vector_proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                vector_proc.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,45 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import time
-import uuid
-from typing import Callable, Awaitable
+from typing import Callable, Awaitable, List, Tuple
 
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
 
-from ai_factory.memory.memory_store import log_event
-from ai_factory.memory.memory_embeddings import add_to_memory
+from ai_factory.memory.memory_store import log_event_async, log_events_async
+from ai_factory.memory.memory_embeddings import index_documents
+from ai_factory.services.planner_records import recall_planner_output
+from ai_factory.tracing import start_request_span
 
 logger = logging.getLogger(__name__)
 
 
+def _index_text(task_type: str, prompt: str, text_resp: str) -> str:
+    return f"task_type={task_type}\nPROMPT:\n{prompt}\nRESPONSE:\n{text_resp}"
+
+
+def _dedup_key(task_type: str, prompt: str) -> str:
+    # The response carries a fresh request_id/created_at every time, so plans
+    # are deduplicated on what determines them (as the planner cache does)
+    return f"task_type={task_type}\nPROMPT:\n{prompt}"
+
+
+async def _index(items: List[Tuple[str, str]], keys: List[str]) -> List[Tuple[str, str]]:
+    """
+    Embed and index off the loop (CPU-bound). Returns the document references,
+    which are logged in the same transaction as the events.
+    """
+    try:
+        return await asyncio.to_thread(index_documents, items, dedup_keys=keys)
+    except Exception as e:
+        logger.exception("Memory indexing error: %s", e)
+        return []
+
+
 class MemoryLoggerMiddleware(BaseHTTPMiddleware):
     """
     Middleware that:
@@ -23,67 +47,113 @@ class MemoryLoggerMiddleware(BaseHTTPMiddleware):
     - writes an event to SQLite
     - indexes response text into the Chroma vector store
     - adds X-Request-ID and X-Duration headers
+    /planner/dispatch_batch is logged per item with one bulk insert and one bulk index write.
+    Planner routes hand over their already-serialized bytes via remember_planner_output,
+    so successful responses are neither drained nor re-decoded here.
+    Each request runs under one trace whose id is the X-Request-ID, the response
+    request_id and the memory_events/vector id (a well-formed inbound
+    X-Request-ID is honored, see start_request_span).
     """
 
     async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
-        if request.url.path.startswith("/planner/dispatch"):
-            req_id = str(uuid.uuid4())
-            started = time.time()
-
-            # Read and preserve request body for downstream handler
+        path = request.url.path
+        if not path.startswith("/planner/dispatch"):
+            # Non-planner routes pass through
+            return await call_next(request)
+        with start_request_span("http.request", request.headers.get("x-request-id"), path=path) as span:
+            if path == "/planner/dispatch_batch":
+                return await self._dispatch_batch(request, call_next, span.trace_id)
+            return await self._dispatch_single(request, call_next, span.trace_id)
+
+    async def _dispatch_single(
+        self, request: Request, call_next: Callable[[Request], Awaitable[Response]], req_id: str
+    ) -> Response:
+        started = time.time()
+
+        # Read and preserve request body for downstream handler
+        try:
+            # Starlette caches request._body so downstream can read again
+            body_bytes = await request.body()
+        except Exception:
+            body_bytes = b""
+
+        response = await call_next(request)
+
+        content_bytes = b""
+        records = recall_planner_output(request)
+        if records:
+            task_type, prompt, content_bytes = records[0].task_type, records[0].prompt, records[0].response
+        else:
+            # Route didn't run (e.g. validation error): parse the request and drain the response
             try:
-                body_bytes = await request.body()
-                # Starlette caches request._body so downstream can read again
                 payload = json.loads(body_bytes.decode("utf-8") or "{}")
             except Exception:
                 payload = {}
-
-            response = await call_next(request)
-
-            # Try to read response body safely
-            content_bytes = b""
+            task_type = str(payload.get("task_type", "unknown"))
+            prompt = str(payload.get("prompt", ""))
             try:
-                # Most Response types (JSONResponse) have .body ready
                 content_bytes = getattr(response, "body", b"") or b""
                 if not content_bytes:
-                    # Fallback: drain iterator and rebuild
                     async for chunk in response.body_iterator:  # type: ignore[attr-defined]
                         content_bytes += chunk
             except Exception:
                 pass
 
-            # Log to DB and index
+        # Index and log to DB
+        text_resp = content_bytes.decode("utf-8", errors="ignore")
+        refs = await _index([(req_id, _index_text(task_type, prompt, text_resp))], [_dedup_key(task_type, prompt)])
+        try:
+            await log_event_async(request_id=req_id, task_type=task_type, prompt=prompt, response=text_resp, doc_refs=refs)
+        except Exception as e:
+            logger.exception("Memory logging error: %s", e)
+
+        # Add headers and return original response when possible
+        duration = time.time() - started
+        response.headers["X-Request-ID"] = req_id
+        response.headers["X-Duration"] = str(round(duration, 3))
+
+        if not records and content_bytes and not getattr(response, "body", None):
+            # If we drained a streaming response, rebuild it
+            return Response(
+                content=content_bytes,
+                status_code=response.status_code,
+                headers=dict(response.headers),
+                media_type=response.media_type,
+            )
+        return response
+
+    async def _dispatch_batch(
+        self, request: Request, call_next: Callable[[Request], Awaitable[Response]], batch_id: str
+    ) -> Response:
+        started = time.time()
+
+        response = await call_next(request)
+
+        records = recall_planner_output(request)
+        if records:
             try:
-                text_resp = content_bytes.decode("utf-8", errors="ignore")
-                log_event(
-                    request_id=req_id,
-                    task_type=str(payload.get("task_type", "unknown")),
-                    prompt=str(payload.get("prompt", "")),
-                    response=text_resp,
-                )
-                # Index prompt + response for better recall
-                to_index = f"task_type={payload.get('task_type','unknown')}\nPROMPT:\n{payload.get('prompt','')}\nRESPONSE:\n{text_resp}"
-                add_to_memory(req_id, to_index)
+                events = []
+                to_index = []
+                keys = []
+                for rec in records:
+                    text_resp = rec.response.decode("utf-8", errors="ignore")
+                    events.append({
+                        "request_id": rec.request_id,
+                        "task_type": rec.task_type,
+                        "prompt": rec.prompt,
+                        "response": text_resp,
+                    })
+                    to_index.append((rec.request_id, _index_text(rec.task_type, rec.prompt, text_resp)))
+                    keys.append(_dedup_key(rec.task_type, rec.prompt))
+                refs = await _index(to_index, keys)
+                await log_events_async(events, doc_refs=refs)
             except Exception as e:
-                logger.exception("Memory logging/indexing error: %s", e)
+                logger.exception("Batch memory logging/indexing error: %s", e)
 
-            # Add headers and return original response when possible
-            duration = time.time() - started
-            response.headers["X-Request-ID"] = req_id
-            response.headers["X-Duration"] = str(round(duration, 3))
-
-            if content_bytes and not getattr(response, "body", None):
-                # If we drained a streaming response, rebuild it
-                return Response(
-                    content=content_bytes,
-                    status_code=response.status_code,
-                    headers=dict(response.headers),
-                    media_type=response.media_type,
-                )
-            return response
-
-        # Non-planner routes pass through
-        return await call_next(request)
+        duration = time.time() - started
+        response.headers["X-Request-ID"] = batch_id
+        response.headers["X-Duration"] = str(round(duration, 3))
+        return response
 
 class DebugLoggerMiddleware(BaseHTTPMiddleware):
     """
@@ -93,11 +163,11 @@ class DebugLoggerMiddleware(BaseHTTPMiddleware):
 
     async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
         if request.url.path.startswith("/debugger/"):
-            req_id = str(uuid.uuid4())
-            started = time.time()
-            response = await call_next(request)
+            with start_request_span("http.request", request.headers.get("x-request-id"), path=request.url.path) as span:
+                started = time.time()
+                response = await call_next(request)
             duration = time.time() - started
-            response.headers["X-Debug-Request-ID"] = req_id
+            response.headers["X-Debug-Request-ID"] = span.trace_id
             response.headers["X-Debug-Duration"] = str(round(duration, 3))
             return response
         return await call_next(request)
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Protocol, Sequence, Tuple, runtime_checkable
+
+from ai_factory.config import settings
+from ai_factory.metrics import registry
+from ai_factory.models import DispatchResponse, TaskType
+from ai_factory.services.planner_cache import cache_key, reissue
+from ai_factory.services.planner_service import StubPlanner, planner, plan_batch
+from ai_factory.tracing import start_span
+
+logger = logging.getLogger(__name__)
+
+
+@runtime_checkable
+class PlannerBackend(Protocol):
+    """
+    Async planner interface. Backends that can plan a whole batch more cheaply
+    than one item at a time may also expose
+    `async plan_many(items) -> List[DispatchResponse]`.
+    """
+
+    name: str
+
+    async def plan(self, prompt: str, task_type: TaskType) -> DispatchResponse: ...
+
+
+class StubPlannerBackend:
+    """Runs the (cached) synchronous StubPlanner off the event loop."""
+
+    name = "stub"
+
+    def __init__(self, sync_planner: Any = None):
+        self.planner = sync_planner or planner
+
+    async def plan(self, prompt: str, task_type: TaskType) -> DispatchResponse:
+        return await asyncio.to_thread(self.planner.plan, prompt, task_type)
+
+    async def plan_many(self, items: Sequence[Tuple[str, TaskType]]) -> List[DispatchResponse]:
+        return await asyncio.to_thread(plan_batch, items)
+
+
+class FakePlannerBackend:
+    """
+    Local stand-in for a remote model: sleeps for `latency` seconds, then returns
+    the stub heuristic plan. Useful for load-testing concurrency and coalescing.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.calls = 0
+        self._planner = StubPlanner()
+
+    async def plan(self, prompt: str, task_type: TaskType) -> DispatchResponse:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        resp = self._planner.plan(prompt, task_type)
+        resp.model_name = "fake/planner-v0"
+        return resp
+
+
+_REGISTRY: Dict[str, Callable[[], PlannerBackend]] = {
+    "stub": StubPlannerBackend,
+    "fake": lambda: FakePlannerBackend(latency=settings.planner_fake_latency),
+}
+
+
+def register_backend(name: str, factory: Callable[[], PlannerBackend]) -> None:
+    """Register a backend factory under `name` so Settings can select it."""
+    _REGISTRY[name] = factory
+
+
+def create_backend(name: str) -> PlannerBackend:
+    try:
+        factory = _REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Unknown planner backend: {name}") from None
+    return factory()
+
+
+class _LoopState:
+    def __init__(self, concurrency: int):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.inflight: Dict[str, "asyncio.Future[DispatchResponse]"] = {}
+
+
+class ManagedBackend:
+    """
+    Wraps a backend with a concurrency limit, a timeout and request coalescing:
+    identical concurrent (prompt, task_type) requests share one in-flight call,
+    and every caller receives its own reissued copy of the result.
+    """
+
+    def __init__(self, backend: PlannerBackend, concurrency: int = 8, timeout: float = 30.0):
+        self.backend = backend
+        self.concurrency = max(1, int(concurrency))
+        self.timeout = timeout
+        # asyncio primitives bind to a loop; keep one set per running loop
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        self.calls = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.running = 0
+        self.waiting = 0
+
+    @property
+    def name(self) -> str:
+        return self.backend.name
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState(self.concurrency)
+        return state
+
+    async def _guarded(self, state: _LoopState, call: Callable[[], Any]) -> Any:
+        self.waiting += 1
+        try:
+            await state.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            with start_span("planner.backend", backend=self.name):
+                return await call()
+        finally:
+            self.running -= 1
+            state.semaphore.release()
+
+    async def _limited(self, state: _LoopState, call: Callable[[], Any]) -> Any:
+        try:
+            return await asyncio.wait_for(self._guarded(state, call), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+
+    async def plan(self, prompt: str, task_type: TaskType) -> DispatchResponse:
+        state = self._state()
+        key = cache_key(prompt, task_type)
+        fut = state.inflight.get(key)
+        if fut is None:
+            self.calls += 1
+            fut = asyncio.ensure_future(self._limited(state, lambda: self.backend.plan(prompt, task_type)))
+            state.inflight[key] = fut
+            fut.add_done_callback(lambda _f: state.inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shield: one caller going away must not cancel the shared computation
+        return reissue(await asyncio.shield(fut))
+
+    async def plan_many(self, items: Sequence[Tuple[str, TaskType]]) -> List[DispatchResponse]:
+        plan_many = getattr(self.backend, "plan_many", None)
+        if plan_many is None:
+            return list(await asyncio.gather(*(self.plan(p, t) for p, t in items)))
+        self.calls += 1
+        return await self._limited(self._state(), lambda: plan_many(items))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "timeout": self.timeout,
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "running": self.running,
+            "waiting": self.waiting,
+        }
+
+
+class PlannerDispatcher:
+    """Routes requests to a managed backend by task_type."""
+
+    def __init__(
+        self,
+        default: str = "stub",
+        routes: Optional[Dict[str, str]] = None,
+        concurrency: int = 8,
+        timeout: float = 30.0,
+        overrides: Optional[Dict[str, Dict[str, float]]] = None,
+    ):
+        self.default = default
+        self.routes = dict(routes or {})
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.overrides = dict(overrides or {})
+        self._backends: Dict[str, ManagedBackend] = {}
+
+    def backend(self, name: str) -> ManagedBackend:
+        managed = self._backends.get(name)
+        if managed is None:
+            limits = self.overrides.get(name, {})
+            managed = ManagedBackend(
+                create_backend(name),
+                concurrency=int(limits.get("concurrency", self.concurrency)),
+                timeout=float(limits.get("timeout", self.timeout)),
+            )
+            self._backends[name] = managed
+        return managed
+
+    def backend_for(self, task_type: TaskType) -> ManagedBackend:
+        return self.backend(self.routes.get(task_type, self.default))
+
+    async def dispatch(self, prompt: str, task_type: TaskType) -> DispatchResponse:
+        return await self.backend_for(task_type).plan(prompt, task_type)
+
+    async def dispatch_many(self, items: Sequence[Tuple[str, TaskType]]) -> List[DispatchResponse]:
+        """Plan a batch, one plan_many call per backend, preserving input order."""
+        groups: Dict[str, List[int]] = {}
+        for i, (_, task_type) in enumerate(items):
+            groups.setdefault(self.routes.get(task_type, self.default), []).append(i)
+
+        results: List[Optional[DispatchResponse]] = [None] * len(items)
+
+        async def run_group(name: str, idxs: List[int]) -> None:
+            planned = await self.backend(name).plan_many([items[i] for i in idxs])
+            for i, resp in zip(idxs, planned):
+                results[i] = resp
+
+        await asyncio.gather(*(run_group(name, idxs) for name, idxs in groups.items()))
+        return results  # type: ignore[return-value]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "default": self.default,
+            "routes": self.routes,
+            "backends": {name: b.stats() for name, b in self._backends.items()},
+        }
+
+
+dispatcher = PlannerDispatcher(
+    default=settings.planner_backend,
+    routes=settings.planner_backend_routes,
+    concurrency=settings.planner_backend_concurrency,
+    timeout=settings.planner_backend_timeout,
+    overrides=settings.planner_backend_overrides,
+)
+
+
+def _queue_depths() -> Dict[Tuple[str, str], float]:
+    depths: Dict[Tuple[str, str], float] = {}
+    for name, managed in dispatcher._backends.items():
+        depths[(name, "waiting")] = float(managed.waiting)
+        depths[(name, "running")] = float(managed.running)
+    return depths
+
+
+registry.gauge(
+    "ai_factory_planner_backend_requests",
+    "Planner backend requests waiting for a concurrency slot or running.",
+    _queue_depths,
+    label_names=("backend", "state"),
+)
+registry.gauge(
+    "ai_factory_planner_backend_utilization",
+    "Fraction of each planner backend's concurrency slots in use.",
+    lambda: {(name,): b.running / b.concurrency for name, b in dispatcher._backends.items()},
+    label_names=("backend",),
+)
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Protocol
+
+from ai_factory.cache import LRUTTLCache
+from ai_factory.memory.memory_db import SessionLocal, PlannerCacheEntry, init_db
+from ai_factory.models import DispatchResponse, TaskType
+from ai_factory.tracing import new_request_id
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(prompt: str, task_type: str) -> str:
+    """
+    Stable cache key over the whitespace-normalized prompt and task_type.
+    Hashed so multi-megabyte prompts don't live in the cache as keys.
+    """
+    normalized = " ".join(prompt.split())
+    return hashlib.sha256(f"{task_type}\x00{normalized}".encode("utf-8")).hexdigest()
+
+
+def reissue(resp: DispatchResponse) -> DispatchResponse:
+    """Return a copy of a cached response with a fresh request_id/created_at."""
+    return resp.model_copy(
+        update={"request_id": new_request_id(), "created_at": datetime.now(timezone.utc)},
+        deep=True,
+    )
+
+
+class PlannerCacheTier(Protocol):
+    def get(self, key: str) -> Optional[DispatchResponse]: ...
+
+    def set(self, key: str, resp: DispatchResponse) -> None: ...
+
+
+class MemoryPlannerCache:
+    """In-process LRU tier with TTL."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self._lru: LRUTTLCache[DispatchResponse] = LRUTTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: str) -> Optional[DispatchResponse]:
+        return self._lru.get(key)
+
+    def set(self, key: str, resp: DispatchResponse) -> None:
+        self._lru.set(key, resp)
+
+    def clear(self) -> None:
+        self._lru.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._lru.stats()
+
+
+class SQLitePlannerCache:
+    """
+    Optional second tier persisted in the shared SQLite database so cached
+    plans survive restarts. Entries older than ttl seconds are ignored, and
+    deleted on every write (created_at is indexed, so this stays cheap).
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = float(ttl)
+        self.hits = 0
+        self.misses = 0
+        init_db()
+
+    def get(self, key: str) -> Optional[DispatchResponse]:
+        with SessionLocal() as session:
+            row = session.get(PlannerCacheEntry, key)
+        if row is None or (self.ttl > 0 and datetime.utcnow() - row.created_at > timedelta(seconds=self.ttl)):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return DispatchResponse.model_validate_json(row.payload)
+
+    def _expired(self):
+        return PlannerCacheEntry.created_at < datetime.utcnow() - timedelta(seconds=self.ttl)
+
+    def prune(self) -> int:
+        """Delete expired entries; returns how many were removed."""
+        if self.ttl <= 0:
+            return 0
+        with SessionLocal() as session:
+            removed = session.query(PlannerCacheEntry).filter(self._expired()).delete(synchronize_session=False)
+            session.commit()
+        return removed
+
+    def set(self, key: str, resp: DispatchResponse) -> None:
+        with SessionLocal() as session:
+            if self.ttl > 0:
+                session.query(PlannerCacheEntry).filter(self._expired()).delete(synchronize_session=False)
+            session.merge(
+                PlannerCacheEntry(
+                    key=key,
+                    created_at=datetime.utcnow(),
+                    task_type=resp.task_type,
+                    payload=resp.model_dump_json(),
+                )
+            )
+            session.commit()
+
+    def clear(self) -> None:
+        with SessionLocal() as session:
+            session.query(PlannerCacheEntry).delete()
+            session.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"ttl": self.ttl, "hits": self.hits, "misses": self.misses}
+
+
+class CachedPlanner:
+    """
+    Wraps any planner exposing plan(prompt, task_type) with a tiered response cache.
+    Lookups go memory -> SQLite -> planner; every hit is reissued with a fresh
+    request_id and created_at so callers never share identifiers.
+    """
+
+    def __init__(self, planner: Any, memory: MemoryPlannerCache, sqlite: Optional[SQLitePlannerCache] = None):
+        self.planner = planner
+        self.memory = memory
+        self.sqlite = sqlite
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose the wrapped planner's helpers (e.g. _heuristic_decompose).
+        # Guarded so a half-built instance (unpickling, copy) can't recurse.
+        if name == "planner" or name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.planner, name)
+
+    def lookup(self, prompt: str, task_type: TaskType) -> Optional[DispatchResponse]:
+        key = cache_key(prompt, task_type)
+        cached = self.memory.get(key)
+        if cached is None and self.sqlite is not None:
+            try:
+                cached = self.sqlite.get(key)
+            except Exception:
+                logger.exception("Planner SQLite cache read failed")
+            if cached is not None:
+                self.memory.set(key, cached)
+        if cached is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return reissue(cached)
+
+    def store(self, prompt: str, task_type: TaskType, resp: DispatchResponse) -> None:
+        key = cache_key(prompt, task_type)
+        snapshot = resp.model_copy(deep=True)
+        self.memory.set(key, snapshot)
+        if self.sqlite is not None:
+            try:
+                self.sqlite.set(key, snapshot)
+            except Exception:
+                logger.exception("Planner SQLite cache write failed")
+
+    def plan(self, prompt: str, task_type: TaskType) -> DispatchResponse:
+        cached = self.lookup(prompt, task_type)
+        if cached is not None:
+            logger.debug("Planner cache hit: task_type=%s prompt_len=%d", task_type, len(prompt))
+            return cached
+        resp = self.planner.plan(prompt, task_type)
+        self.store(prompt, task_type, resp)
+        return resp
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.sqlite is not None:
+            self.sqlite.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "memory": self.memory.stats(),
+            "sqlite": self.sqlite.stats() if self.sqlite is not None else None,
+        }
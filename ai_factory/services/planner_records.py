@@ -0,0 +1,28 @@
+"""
+Hand-off between the planner routes and MemoryLoggerMiddleware: routes
+record what they planned on request.state, the middleware logs and indexes it.
+"""
+from __future__ import annotations
+
+from typing import List, NamedTuple, Optional
+
+from starlette.requests import Request
+
+
+class PlannerRecord(NamedTuple):
+    """One planned item as handed from the planner routes to the middleware."""
+
+    request_id: str
+    task_type: str
+    prompt: str
+    response: bytes
+
+
+def remember_planner_output(request: Request, records: List[PlannerRecord]) -> None:
+    """Let MemoryLoggerMiddleware reuse the route's parsed request and serialized response."""
+    request.state.planner_records = records
+
+
+def recall_planner_output(request: Request) -> Optional[List[PlannerRecord]]:
+    """Records left by remember_planner_output, or None when the route didn't set any."""
+    return getattr(request.state, "planner_records", None)
@@ -1,66 +1,217 @@
 import logging
-from typing import List
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterator, List, Optional, Pattern, Sequence, Tuple, Union
+from ai_factory.config import settings
+from ai_factory.metrics import registry, timed
+from ai_factory.tracing import start_span
 from ai_factory.models import PlanStep, TaskType, DispatchResponse
+from ai_factory.services.planner_cache import CachedPlanner, MemoryPlannerCache, SQLitePlannerCache
 
 logger = logging.getLogger(__name__)
 
 
+# Step boundaries in priority order: (literal prefilter, detector, splitter).
+# Only the first boundary present in a prompt is used. Word separators match raw
+# text the way they would after collapsing whitespace runs to single spaces; the
+# detector leaves trailing whitespace unconsumed so overlaps ("a -> and then b")
+# are seen exactly as substring checks would see them.
+_SEPARATORS: Tuple[Tuple[str, Optional[Pattern[str]], Pattern[str]], ...] = tuple(
+    (literal, re.compile(detect) if detect else None, re.compile(split))
+    for literal, detect, split in (
+        (".", None, r"\."),
+        (";", None, r";"),
+        ("and", r"(?<=\S)\s+and\s+then(?=\s+\S)", r"(?<=\S)\s+and\s+then\s+(?=\S)"),
+        ("then", r"(?<=\S)\s+then(?=\s+\S)", r"(?<=\S)\s+then\s+(?=\S)"),
+        ("->", r"(?<=\S)\s+->(?=\s+\S)", r"(?<=\S)\s+->\s+(?=\S)"),
+        ("—", r"(?<=\S)\s+—(?=\s+\S)", r"(?<=\S)\s+—\s+(?=\S)"),
+    )
+)
+_WORD_RE = re.compile(r"\S+")
+_STRIP_CHARS = " -—>.;"
+
+
 class StubPlanner:
     """
     A simple, deterministic planner that turns a prompt into a few actionable steps.
     This is a placeholder for a future model-driven planner.
     """
 
-    def _heuristic_decompose(self, prompt: str, task_type: TaskType) -> List[PlanStep]:
-        # Basic heuristics to split into steps by punctuation or conjunctions
-        text = " ".join(prompt.strip().split())
-        candidates = []
-        # Split on obvious boundaries
-        for sep in [".", ";", " and then ", " then ", " -> ", " — "]:
-            parts = []
-            if sep in text:
-                parts = [p.strip(" -—>.;") for p in text.split(sep)]
-                candidates = [p for p in parts if p]
-                break
-        if not candidates:
+    # Pure Python work with no I/O: batches are worth spreading across processes
+    cpu_bound = True
+
+    def __init__(self, max_steps: Optional[int] = None):
+        self.max_steps = max_steps
+
+    @staticmethod
+    def _pick_separator(text: str) -> Optional[Pattern[str]]:
+        """Highest-priority separator present in text (C-speed prefilter, early-exit search)."""
+        for literal, detect, split in _SEPARATORS:
+            if literal in text and (detect is None or detect.search(text)):
+                return split
+        return None
+
+    def _iter_candidates(self, prompt: str) -> Iterator[str]:
+        """Lazily yield whitespace-normalized prompt segments."""
+        sep = self._pick_separator(prompt)
+        produced = False
+        if sep is not None:
+            pos = 0
+            for m in sep.finditer(prompt):
+                part = " ".join(prompt[pos:m.start()].split()).strip(_STRIP_CHARS)
+                pos = m.end()
+                if part:
+                    produced = True
+                    yield part
+            part = " ".join(prompt[pos:].split()).strip(_STRIP_CHARS)
+            if part:
+                produced = True
+                yield part
+        if not produced:
             # Fallback: naive chunking by ~12 words
-            words = text.split()
-            chunk = 12
-            candidates = [" ".join(words[i:i+chunk]) for i in range(0, len(words), chunk)]
+            words = (m.group(0) for m in _WORD_RE.finditer(prompt))
+            while True:
+                chunk = list(islice(words, 12))
+                if not chunk:
+                    break
+                yield " ".join(chunk)
 
+    def _heuristic_decompose(self, prompt: str, task_type: TaskType, max_steps: Optional[int] = None) -> List[PlanStep]:
+        # Split into steps by punctuation or conjunctions, capped at max_steps derived steps
+        limit = self.max_steps if max_steps is None else max_steps
         steps: List[PlanStep] = []
-        for idx, c in enumerate(candidates):
-            steps.append(
-                PlanStep(
-                    index=idx,
-                    action=c,
-                    rationale=f"Derived from prompt segment {idx+1}.",
-                )
-            )
 
         # Add guard-rail steps depending on task type
         if task_type in ("coding",):
-            steps.insert(
-                0,
+            steps.append(
                 PlanStep(
                     index=0,
                     action="Scaffold repo and write minimal tests.",
                     rationale="Enable quick feedback and regression checks.",
-                ),
+                )
             )
-            # Reindex
-            for i, s in enumerate(steps):
-                s.index = i
 
+        offset = len(steps)
+        for idx, c in enumerate(islice(self._iter_candidates(prompt), limit)):
+            steps.append(
+                PlanStep(
+                    index=offset + idx,
+                    action=c,
+                    rationale=f"Derived from prompt segment {idx+1}.",
+                )
+            )
         return steps
 
+    @timed("planner_compute")
     def plan(self, prompt: str, task_type: TaskType) -> DispatchResponse:
         logger.info("Planning request: task_type=%s prompt_len=%d", task_type, len(prompt))
-        steps = self._heuristic_decompose(prompt, task_type)
+        with start_span("planner.plan", task_type=task_type, prompt_len=len(prompt)):
+            steps = self._heuristic_decompose(prompt, task_type)
         # Rough token estimate: 1 token ~ 4 chars (very approximate)
         est_tokens = max(32, int(len(prompt) / 4) + 8 * len(steps))
         notes = "This plan was generated by a stub heuristic planner."
         return DispatchResponse.make(task_type=task_type, steps=steps, estimated_tokens=est_tokens, notes=notes)
 
 
-planner = StubPlanner()
+def _build_planner() -> Union[StubPlanner, CachedPlanner]:
+    base = StubPlanner(max_steps=settings.planner_max_steps)
+    if not settings.planner_cache_enabled:
+        return base
+    memory = MemoryPlannerCache(maxsize=settings.planner_cache_size, ttl=settings.planner_cache_ttl)
+    sqlite = SQLitePlannerCache(ttl=settings.planner_cache_ttl) if settings.planner_cache_sqlite else None
+    return CachedPlanner(base, memory=memory, sqlite=sqlite)
+
+
+planner = _build_planner()
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_busy = 0
+# plan_batch runs in worker threads (asyncio.to_thread): guards _pool and _pool_busy
+_pool_lock = threading.Lock()
+_worker_planner: Optional[StubPlanner] = None
+
+
+def _plan_in_worker(item: Tuple[str, TaskType]) -> DispatchResponse:
+    global _worker_planner
+    if _worker_planner is None:
+        _worker_planner = StubPlanner(max_steps=settings.planner_max_steps)
+    return _worker_planner.plan(*item)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: never fork the server process with its threads and open handles
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.planner_batch_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def plan_batch(items: Sequence[Tuple[str, TaskType]]) -> List[DispatchResponse]:
+    """
+    Plan many (prompt, task_type) pairs, preserving order.
+    Cache hits are served directly; misses run in the process pool when the
+    planner is CPU-bound and the batch is large enough to amortize IPC.
+    """
+    results: List[Optional[DispatchResponse]] = [None] * len(items)
+    misses: List[int] = []
+    lookup = getattr(planner, "lookup", None)
+    for i, (prompt, task_type) in enumerate(items):
+        cached = lookup(prompt, task_type) if lookup is not None else None
+        if cached is None:
+            misses.append(i)
+        else:
+            results[i] = cached
+
+    base = getattr(planner, "planner", planner)
+    use_pool = (
+        settings.planner_batch_workers > 0
+        and getattr(base, "cpu_bound", False)
+        and len(misses) >= settings.planner_batch_parallel_min
+    )
+    if use_pool:
+        global _pool_busy
+        chunksize = max(1, len(misses) // (settings.planner_batch_workers * 4))
+        with _pool_lock:
+            _pool_busy += 1
+        try:
+            with timed("planner_pool_batch"), start_span("planner.pool_batch", size=len(misses)):
+                computed = list(_get_pool().map(_plan_in_worker, [items[i] for i in misses], chunksize=chunksize))
+        finally:
+            with _pool_lock:
+                _pool_busy -= 1
+    else:
+        computed = [base.plan(*items[i]) for i in misses]
+
+    store = getattr(planner, "store", None)
+    for i, resp in zip(misses, computed):
+        results[i] = resp
+        if store is not None:
+            store(items[i][0], items[i][1], resp)
+    return results  # type: ignore[return-value]
+
+
+registry.gauge(
+    "ai_factory_planner_pool_workers",
+    "Planner batch process pool size by state.",
+    lambda: {
+        ("configured",): float(settings.planner_batch_workers),
+        ("started",): float(len(getattr(_pool, "_processes", None) or {})),
+        ("batches_in_flight",): float(_pool_busy),
+    },
+    label_names=("state",),
+)
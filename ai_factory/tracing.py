@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Protocol
+from uuid import uuid4
+
+from ai_factory.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JSONL_PATH = os.path.join(os.path.dirname(__file__), "data", "traces", "spans.jsonl")
+
+
+class Span:
+    """A timed unit of work. Unsampled spans only carry ids for propagation."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "sampled", "start", "end", "attributes", "status")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool):
+        self.name = name
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.span_id = os.urandom(8).hex() if sampled else ""
+        self.start = time.time() if sampled else 0.0
+        self.end = 0.0
+        self.attributes: Dict[str, Any] = {}
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.sampled:
+            self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round((self.end - self.start) * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+class NoopExporter:
+    def export(self, span: Span) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JsonlSpanExporter:
+    """Append finished spans as JSON lines to a local file (tests, local debugging)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._fh = open(path, "ab")
+
+    def export(self, span: Span) -> None:
+        line = dumps(span.to_dict()) + b"\n"
+        with self._lock:
+            self._fh.write(line)
+            self._fh.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._fh.close()
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("ai_factory_current_span", default=None)
+
+
+class Tracer:
+    """
+    contextvars-based tracer. The sampling decision is made once at the root span
+    and inherited by children, so an unsampled request costs a ContextVar set/reset
+    per span and nothing else.
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter] = None, sample_rate: float = 1.0):
+        self.exporter: SpanExporter = exporter or NoopExporter()
+        self.sample_rate = sample_rate
+
+    def configure(self, exporter: Optional[SpanExporter] = None, sample_rate: Optional[float] = None) -> None:
+        if exporter is not None:
+            old, self.exporter = self.exporter, exporter
+            if old is not exporter:
+                old.shutdown()
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+
+    def _should_sample(self) -> bool:
+        if isinstance(self.exporter, NoopExporter) or self.sample_rate <= 0:
+            return False
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    @contextmanager
+    def span(self, name: str, trace_id: Optional[str] = None, **attributes: Any) -> Iterator[Span]:
+        parent = _current_span.get()
+        if parent is not None:
+            span = Span(name, parent.trace_id, parent.span_id or None, parent.sampled)
+        else:
+            span = Span(name, trace_id or str(uuid4()), None, self._should_sample())
+        if span.sampled and attributes:
+            span.attributes.update(attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.set_attribute("error", repr(e))
+            raise
+        finally:
+            _current_span.reset(token)
+            if span.sampled:
+                span.end = time.time()
+                try:
+                    self.exporter.export(span)
+                except Exception:
+                    logger.exception("Span export failed")
+
+    def traced(self, name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorator form of span() for sync and async functions."""
+
+        def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    with self.span(name):
+                        return await fn(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.span(name):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorate
+
+
+tracer = Tracer()
+
+
+def start_span(name: str, trace_id: Optional[str] = None, **attributes: Any):
+    return tracer.span(name, trace_id=trace_id, **attributes)
+
+
+# Inbound ids adopted as trace ids: a UUID or 16-64 hex chars (W3C trace ids are 32)
+_TRACE_ID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[0-9a-f]{16,64}")
+_INBOUND_ID_MAX = 128
+
+
+def valid_trace_id(value: Optional[str]) -> Optional[str]:
+    """value, lowercased, if it is a well-formed trace id; None otherwise."""
+    if not value:
+        return None
+    value = value.strip().lower()
+    return value if _TRACE_ID_RE.fullmatch(value) else None
+
+
+def start_request_span(name: str, inbound_id: Optional[str], **attributes: Any):
+    """
+    Root span for an HTTP request. The trace id becomes the request_id stored
+    in SQLite and the vector store, so an inbound X-Request-ID is adopted only
+    when valid_trace_id accepts it; otherwise a fresh id is generated. Any
+    inbound value is kept (truncated) as the inbound_request_id attribute.
+    """
+    if inbound_id is not None:
+        attributes["inbound_request_id"] = inbound_id[:_INBOUND_ID_MAX]
+    return tracer.span(name, trace_id=valid_trace_id(inbound_id), **attributes)
+
+
+def traced(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    return tracer.traced(name)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span is not None else None
+
+
+def new_request_id() -> str:
+    """The active trace id, so responses, DB rows and vectors share one id; else a fresh uuid."""
+    return current_trace_id() or str(uuid4())
+
+
+def configure_from_settings(settings: Any) -> None:
+    if settings.trace_exporter == "jsonl":
+        tracer.configure(JsonlSpanExporter(settings.trace_jsonl_path or DEFAULT_JSONL_PATH), settings.trace_sample_rate)
+    else:
+        tracer.configure(NoopExporter(), settings.trace_sample_rate)
+
+
+def shutdown() -> None:
+    tracer.exporter.shutdown()
+
+
+class TraceContextFilter(logging.Filter):
+    """Stamp log records with the active trace id (use %(trace_id)s in formats)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = current_trace_id() or "-"
+        return True
@@ -0,0 +1,85 @@
+"""
+Benchmark CLI.
+
+    python -m benchmarks micro [--only decompose ...] [--out micro.json]
+    python -m benchmarks load [--endpoints planner_dispatch memory_search] [--concurrency 32] [--corpus 10000]
+    python -m benchmarks compare baseline.json candidate.json [--threshold 0.1]
+
+Unless AI_FACTORY_DB_PATH is already set, runs use a scratch SQLite file so the
+checked-in database is never touched. Embeddings default to the FAKE backend.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+
+def _isolate() -> None:
+    # Must happen before anything imports ai_factory.memory
+    os.environ.setdefault("AI_FACTORY_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="ai_factory_bench_"), "bench.db"))
+    os.environ.setdefault("AI_FACTORY_EMBEDDINGS_BACKEND", "FAKE")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    m = sub.add_parser("micro", help="micro-benchmarks of hot functions")
+    m.add_argument("--only", nargs="*", default=[])
+    m.add_argument("--sizes", type=int, nargs="+", default=[1024, 64 * 1024, 1024 * 1024])
+    m.add_argument("--corpus-sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    m.add_argument("--repeat", type=int, default=20)
+    m.add_argument("--out", default="-")
+
+    l = sub.add_parser("load", help="in-process ASGI load test")
+    l.add_argument("--endpoints", nargs="+", default=["healthcheck", "planner_dispatch", "memory_search"])
+    l.add_argument("--requests", type=int, default=200)
+    l.add_argument("--concurrency", type=int, nargs="+", default=[16])
+    l.add_argument("--corpus", type=int, default=0)
+    l.add_argument("--no-lifespan", action="store_true")
+    l.add_argument("--out", default="-")
+
+    c = sub.add_parser("compare", help="diff two JSON reports")
+    c.add_argument("baseline")
+    c.add_argument("candidate")
+    c.add_argument("--threshold", type=float, default=0.10)
+
+    args = ap.parse_args(argv)
+    _isolate()
+
+    from benchmarks._harness import report, write_report
+
+    if args.cmd == "micro":
+        from benchmarks import micro
+
+        results = micro.run(only=args.only, sizes=args.sizes, corpus_sizes=args.corpus_sizes, repeat=args.repeat)
+        write_report(report("micro", results, vars(args)), args.out)
+    elif args.cmd == "load":
+        from benchmarks import loadgen
+
+        results = {}
+        for concurrency in args.concurrency:
+            results.update(
+                loadgen.run(
+                    endpoints=args.endpoints,
+                    requests=args.requests,
+                    concurrency=concurrency,
+                    corpus=args.corpus,
+                    lifespan=not args.no_lifespan,
+                )
+            )
+        write_report(report("load", results, vars(args)), args.out)
+    else:
+        from benchmarks.compare import compare, load
+
+        rows = compare(load(args.baseline), load(args.candidate), args.threshold)
+        print(json.dumps(rows, indent=2))
+        return 1 if any(r["regression"] for r in rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
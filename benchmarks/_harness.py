@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import json
+import math
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Sequence
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of samples (pct in 0..100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """Latency summary in seconds, rounded for stable JSON diffs."""
+    n = len(samples)
+    return {
+        "n": n,
+        "min": round(min(samples), 9) if n else 0.0,
+        "mean": round(sum(samples) / n, 9) if n else 0.0,
+        "p50": round(percentile(samples, 50), 9),
+        "p95": round(percentile(samples, 95), 9),
+        "p99": round(percentile(samples, 99), 9),
+        "max": round(max(samples), 9) if n else 0.0,
+    }
+
+
+def measure(fn: Callable[[], Any], repeat: int = 20, warmup: int = 2) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples)
+
+
+def report(kind: str, results: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "meta": {
+            "kind": kind,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "args": args,
+        },
+        "results": results,
+    }
+
+
+def write_report(data: Dict[str, Any], path: str = "-") -> None:
+    text = json.dumps(data, indent=2, sort_keys=True)
+    if path == "-":
+        print(text)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
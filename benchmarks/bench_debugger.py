@@ -0,0 +1,44 @@
+"""
+Debugger run latency: cold interpreter spawn vs the fork server.
+
+    python -m benchmarks.bench_debugger [--preload numpy] [--repeat 20]
+
+Each snippet imports the preloaded modules, as typical /debugger/run payloads
+do. Prints JSON latency summaries (seconds) per mode and the p50 speed-up.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Dict, List
+
+from benchmarks._harness import measure
+
+from ai_factory.debugger.debugger_runner import run_file
+from ai_factory.debugger.fork_server import ForkServer
+
+
+def bench(preload: List[str], repeat: int = 20) -> Dict[str, Dict[str, float]]:
+    code = "".join(f"import {m}\n" for m in preload) + "print('ok')\n"
+    results = {"cold_spawn": measure(lambda: run_file([sys.executable], code, ".py"), repeat=repeat, warmup=1)}
+    server = ForkServer(preload)
+    server.start()
+    try:
+        results["fork_server"] = measure(lambda: server.run(code), repeat=repeat, warmup=1)
+    finally:
+        server.shutdown()
+    results["speedup_p50"] = {"x": round(results["cold_spawn"]["p50"] / results["fork_server"]["p50"], 1)}
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--preload", nargs="*", default=["json", "decimal", "email.parser"])
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+    print(json.dumps(bench(args.preload, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
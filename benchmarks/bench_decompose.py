@@ -0,0 +1,60 @@
+"""
+Micro-benchmark for StubPlanner._heuristic_decompose over prompt sizes.
+
+    python -m benchmarks.bench_decompose [--sizes 1024 10240 ...] [--repeat 3]
+
+Prints JSON with seconds and ns/byte per size; flat ns/byte means linear scaling.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Dict, List
+
+from ai_factory.services.planner_service import StubPlanner
+
+DEFAULT_SIZES = [1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024]
+
+_SENTENCE = "Parse the   input spec and then validate each field against the schema.\n"
+_RUNON = "collect requirements then draft the design then review with the team "
+
+
+def make_prompt(size: int, kind: str = "sentences") -> str:
+    unit = _SENTENCE if kind == "sentences" else _RUNON
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def bench(sizes: List[int], repeat: int = 3, max_steps=None) -> List[Dict[str, float]]:
+    planner = StubPlanner(max_steps=max_steps)
+    rows = []
+    for kind in ("sentences", "runon"):
+        for size in sizes:
+            prompt = make_prompt(size, kind)
+            best = float("inf")
+            n_steps = 0
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                n_steps = len(planner._heuristic_decompose(prompt, "general"))
+                best = min(best, time.perf_counter() - t0)
+            rows.append({
+                "kind": kind,
+                "bytes": size,
+                "steps": n_steps,
+                "seconds": round(best, 6),
+                "ns_per_byte": round(best * 1e9 / size, 2),
+            })
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--max-steps", type=int, default=None)
+    args = ap.parse_args()
+    print(json.dumps(bench(args.sizes, args.repeat, args.max_steps), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Event-loop lag under /planner/dispatch load: blocking vs async persistence.
+
+    python -m benchmarks.bench_event_loop [--requests 300] [--rate 100] [--concurrency 32] [--hold-ms 20]
+
+"blocking" replays the old middleware, which wrote the SQLite row and the
+embedding inline on the event loop; "async" is the current middleware
+(aiosqlite for the row, a worker thread for the embedding). A probe task
+sleeps 5 ms in a loop and records how late it wakes up.
+
+Two load shapes per mode: "fixed_rate" issues requests at a steady rate
+regardless of completions (how much one request's I/O delays the others),
+"saturated" keeps `concurrency` requests in flight (peak throughput; lag
+there is mostly the queue of ready tasks). Prints JSON with throughput,
+request latency and probe lag (seconds).
+
+--hold-ms simulates another worker sharing the database: a separate
+connection takes the write lock for that long every 100 ms, so writes
+sometimes wait in SQLite's busy handler (0 disables it).
+
+Runs against a scratch SQLite file unless AI_FACTORY_DB_PATH is set.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from types import SimpleNamespace
+from typing import Any, Awaitable, Dict, Iterator, List
+
+# Must happen before anything imports ai_factory.memory
+os.environ.setdefault("AI_FACTORY_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="ai_factory_bench_"), "bench.db"))
+os.environ.setdefault("AI_FACTORY_EMBEDDINGS_BACKEND", "FAKE")
+
+from benchmarks import loadgen  # noqa: E402
+from benchmarks._harness import summarize  # noqa: E402
+
+_PROBE_INTERVAL = 0.005
+_HOLD_EVERY = 0.1
+
+
+@contextmanager
+def _blocking_middleware() -> Iterator[None]:
+    """Swap the middleware's async persistence for inline sync calls."""
+    from ai_factory.memory.memory_store import log_event, log_events, record_doc_refs
+    from ai_factory.services import middleware
+
+    async def log_event_inline(doc_refs: Any = (), **kwargs: Any) -> None:
+        log_event(**kwargs)
+        record_doc_refs(doc_refs)
+
+    async def log_events_inline(events: List[Any], doc_refs: Any = ()) -> None:
+        log_events(events)
+        record_doc_refs(doc_refs)
+
+    async def run_inline(fn: Any, *args: Any, **kwargs: Any) -> Any:
+        return fn(*args, **kwargs)
+
+    saved = (middleware.log_event_async, middleware.log_events_async, middleware.asyncio)
+    middleware.log_event_async = log_event_inline
+    middleware.log_events_async = log_events_inline
+    middleware.asyncio = SimpleNamespace(to_thread=run_inline)  # type: ignore[assignment]
+    try:
+        yield
+    finally:
+        middleware.log_event_async, middleware.log_events_async, middleware.asyncio = saved
+
+
+async def _probe(stop: asyncio.Event, lags: List[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        t0 = loop.time()
+        await asyncio.sleep(_PROBE_INTERVAL)
+        lags.append(max(0.0, loop.time() - t0 - _PROBE_INTERVAL))
+
+
+@contextmanager
+def _competing_writer(hold_ms: float) -> Iterator[None]:
+    """Another process's writes, as seen by this one: the write lock is periodically taken."""
+    if hold_ms <= 0:
+        yield
+        return
+    from ai_factory.memory.memory_db import DB_PATH
+
+    stop = threading.Event()
+
+    def hold() -> None:
+        conn = sqlite3.connect(DB_PATH, isolation_level=None, timeout=30)
+        try:
+            while not stop.wait(_HOLD_EVERY):
+                conn.execute("BEGIN IMMEDIATE")
+                time.sleep(hold_ms / 1000)
+                conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    thread = threading.Thread(target=hold, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+async def _drive_rate(client: Any, requests: int, rate: float, seed: int) -> Dict[str, Any]:
+    make = loadgen.ENDPOINTS["planner_dispatch"]
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(method: str, path: str, params: Any, body: Any) -> None:
+        nonlocal errors
+        t0 = time.perf_counter()
+        r = await client.request(method, path, params=params, json=body)
+        latencies.append(time.perf_counter() - t0)
+        errors += r.status_code >= 400
+
+    started = time.perf_counter()
+    tasks = []
+    for i in range(requests):
+        # Absolute schedule, so a stalled loop doesn't lower the offered rate
+        delay = started + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(*make(rng))))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "rate": rate,
+        "errors": errors,
+        "seconds": round(elapsed, 6),
+        "throughput_rps": round(requests / elapsed, 2),
+        "latency": summarize(latencies),
+    }
+
+
+async def _with_probe(load: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+    stop = asyncio.Event()
+    lags: List[float] = []
+    probe = asyncio.create_task(_probe(stop, lags))
+    try:
+        result = await load
+    finally:
+        stop.set()
+        await probe
+    result["loop_lag"] = summarize(lags)
+    return result
+
+
+async def _run_mode(mode: str, requests: int, rate: float, concurrency: int, hold_ms: float) -> Dict[str, Any]:
+    from ai_factory.main import app
+
+    with _blocking_middleware() if mode == "blocking" else nullcontext():
+        async with loadgen._client(app, lifespan=False) as client:
+            # Warm up connections, table creation and the planner cache
+            await loadgen._drive(client, "planner_dispatch", 20, 4, seed=0)
+            with _competing_writer(hold_ms):
+                return {
+                    "fixed_rate": await _with_probe(_drive_rate(client, requests, rate, seed=1)),
+                    "saturated": await _with_probe(loadgen._drive(client, "planner_dispatch", requests, concurrency, seed=2)),
+                }
+
+
+async def bench_async(
+    requests: int = 300, rate: float = 100.0, concurrency: int = 32, hold_ms: float = 20.0
+) -> Dict[str, Dict[str, Any]]:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    results = {}
+    for mode in ("blocking", "async"):
+        results[mode] = await _run_mode(mode, requests, rate, concurrency, hold_ms)
+    return results
+
+
+def bench(requests: int = 300, rate: float = 100.0, concurrency: int = 32, hold_ms: float = 20.0) -> Dict[str, Dict[str, Any]]:
+    return asyncio.run(bench_async(requests, rate, concurrency, hold_ms))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--requests", type=int, default=300)
+    ap.add_argument("--rate", type=float, default=100.0, help="requests/second for the fixed-rate phase")
+    ap.add_argument("--concurrency", type=int, default=32, help="requests in flight for the saturated phase")
+    ap.add_argument("--hold-ms", type=float, default=20.0, help="competing writer lock hold time (0 = none)")
+    args = ap.parse_args()
+    print(json.dumps(bench(args.requests, args.rate, args.concurrency, args.hold_ms), indent=2))
+
+
+if __name__ == "__main__":
+    main()
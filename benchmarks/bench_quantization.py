@@ -0,0 +1,127 @@
+"""
+Memory and recall of the quantized vector store against the float32 baseline.
+
+    python -m benchmarks.bench_quantization [--n 100000] [--dim 384] [--k 10] [--queries 100]
+
+Vectors are synthetic and clustered (closer to real sentence embeddings than
+uniform noise). recall@k is measured against an exact float32 scan.
+
+Memory is what the app would actually hold: each configuration is built in a
+fresh process and "resident_bytes" is that process's RSS growth while the
+documents and vectors are added, so it counts everything in RAM (the codes,
+the id and offset tables, and for "none" the Chroma collection, which keeps
+float32 vectors itself). "compression" is relative to "none";
+"index_bytes" is the quantized codes alone. Prints JSON, one row per
+configuration, with p50 query latency.
+"""
+from __future__ import annotations
+
+import argparse
+import ctypes
+import ctypes.util
+import gc
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+CONFIGS = [("none", 0), ("float32", 0), ("float16", 0), ("float16", 4), ("int8", 0), ("int8", 4)]
+_BATCH = 10000
+
+
+def make_vectors(n: int, dim: int, seed: int = 3, clusters: int = 256) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    return centers[rng.integers(0, clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def _rss() -> int:
+    """
+    Resident set size of this process in bytes (Linux), after returning freed
+    heap to the OS so transient batch buffers don't count as held memory.
+    """
+    gc.collect()
+    libc = ctypes.util.find_library("c")
+    if libc:
+        trim = getattr(ctypes.CDLL(libc), "malloc_trim", None)
+        if trim is not None:
+            trim(0)
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _measure(dtype: str, rerank: int, n: int, dim: int, k: int, queries: int) -> Dict[str, Any]:
+    """One configuration, run in its own process so RSS growth is attributable."""
+    import chromadb
+
+    from ai_factory.memory.vector_index import QuantizedCollection, QuantizedVectorIndex
+
+    data = make_vectors(n, dim)
+    ids = [f"d{i}" for i in range(n)]
+    docs = [f"document {i}" for i in range(n)]
+    scratch = tempfile.mkdtemp(prefix="ai_factory_bench_")
+    before = _rss()
+
+    index: Optional[QuantizedVectorIndex] = None
+    if dtype == "none":
+        store: Any = chromadb.PersistentClient(path=scratch).get_or_create_collection("memory")
+        for start in range(0, n, _BATCH):
+            end = start + _BATCH
+            store.add(documents=docs[start:end], ids=ids[start:end], embeddings=data[start:end].tolist())
+    else:
+        index = QuantizedVectorIndex(dtype, scratch_dir=scratch)
+        store = QuantizedCollection(index, embedding_function=None, rerank=rerank)
+        for start in range(0, n, _BATCH):
+            end = start + _BATCH
+            store.add(documents=docs[start:end], ids=ids[start:end], embeddings=data[start:end])
+    row: Dict[str, Any] = {"dtype": dtype, "rerank": rerank, "resident_bytes": _rss() - before}
+    if index is None:
+        shutil.rmtree(scratch, ignore_errors=True)
+        return row
+
+    row["index_bytes"] = index.nbytes()
+    unit = data / np.linalg.norm(data, axis=1, keepdims=True)
+    hits = 0
+    latencies = []
+    for q in make_vectors(queries, dim, seed=4):
+        expected = set(np.argsort(-(unit @ (q / np.linalg.norm(q))))[:k])
+        t0 = time.perf_counter()
+        found, _ = index.search(q, k, rerank=rerank)
+        latencies.append(time.perf_counter() - t0)
+        hits += len(expected & {int(i[1:]) for i in found})
+    row[f"recall@{k}"] = round(hits / (k * queries), 4)
+    row["query_ms_p50"] = round(float(np.median(latencies)) * 1000, 3)
+    store.close()
+    shutil.rmtree(scratch, ignore_errors=True)
+    return row
+
+
+def bench(n: int, dim: int, k: int = 10, queries: int = 100) -> List[Dict[str, Any]]:
+    ctx = multiprocessing.get_context("spawn")
+    rows = []
+    for dtype, rerank in CONFIGS:
+        with ctx.Pool(1) as pool:
+            rows.append(pool.apply(_measure, (dtype, rerank, n, dim, k, queries)))
+    baseline = rows[0]["resident_bytes"]
+    for row in rows:
+        row["compression"] = round(baseline / max(row["resident_bytes"], 1), 2)
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--queries", type=int, default=100)
+    args = ap.parse_args()
+    print(json.dumps(bench(args.n, args.dim, args.k, args.queries), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Serialization benchmark for DispatchResponse with large step lists.
+
+    python -m benchmarks.bench_serialization [--steps 10 1000 100000] [--repeat 5]
+
+Compares FastAPI's default path (jsonable_encoder + json.dumps) with
+model_dump_json bytes (ModelJSONResponse) and orjson over model_dump().
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+
+from ai_factory.models import DispatchResponse, PlanStep
+from ai_factory.serialization import HAS_ORJSON, ModelJSONResponse, dumps
+
+DEFAULT_STEPS = [10, 100, 1000, 10_000, 100_000]
+
+
+def make_response(n_steps: int) -> DispatchResponse:
+    steps = [
+        PlanStep(index=i, action=f"Do part {i} of the specification carefully", rationale=f"Derived from prompt segment {i+1}.")
+        for i in range(n_steps)
+    ]
+    return DispatchResponse.make(task_type="general", steps=steps, estimated_tokens=8 * n_steps, notes="bench")
+
+
+def _best(fn: Callable[[], bytes], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench(step_counts: List[int], repeat: int = 5) -> List[Dict[str, float]]:
+    rows = []
+    for n in step_counts:
+        resp = make_response(n)
+        cases = {
+            "jsonable_encoder+json": lambda: json.dumps(jsonable_encoder(resp), ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+            "model_dump_json": lambda: ModelJSONResponse(resp).body,
+        }
+        if HAS_ORJSON:
+            cases["orjson(model_dump)"] = lambda: dumps(resp.model_dump(mode="json"))
+        row: Dict[str, float] = {"steps": n, "bytes": len(ModelJSONResponse(resp).body)}
+        for name, fn in cases.items():
+            row[name] = round(_best(fn, repeat), 6)
+        rows.append(row)
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--steps", type=int, nargs="+", default=DEFAULT_STEPS)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    print(json.dumps(bench(args.steps, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Diff two benchmark JSON reports produced by `python -m benchmarks ...`."""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List
+
+# Metrics where a higher number is better; everything else is a latency
+_HIGHER_IS_BETTER = {"throughput_rps"}
+_TRACKED = ("p50", "p95", "p99", "mean", "throughput_rps")
+
+
+def _flatten(entry: Dict[str, Any]) -> Dict[str, float]:
+    flat: Dict[str, float] = {}
+    for k, v in entry.items():
+        if isinstance(v, dict):
+            for kk, vv in v.items():
+                if kk in _TRACKED:
+                    flat[kk] = vv
+        elif k in _TRACKED:
+            flat[k] = v
+    return flat
+
+
+def compare(baseline: Dict[str, Any], candidate: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    Return one row per (case, metric) present in both reports with the relative
+    change; `regression` is set when the change is worse than threshold.
+    """
+    rows = []
+    base_results = baseline.get("results", {})
+    cand_results = candidate.get("results", {})
+    for case in sorted(set(base_results) & set(cand_results)):
+        base, cand = _flatten(base_results[case]), _flatten(cand_results[case])
+        for metric in _TRACKED:
+            if metric not in base or metric not in cand or not base[metric]:
+                continue
+            change = (cand[metric] - base[metric]) / base[metric]
+            worse = -change if metric in _HIGHER_IS_BETTER else change
+            rows.append({
+                "case": case,
+                "metric": metric,
+                "baseline": base[metric],
+                "candidate": cand[metric],
+                "change": round(change, 4),
+                "regression": worse > threshold,
+            })
+    return rows
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,131 @@
+"""
+In-process ASGI load generator: drives ai_factory.main:app through httpx without
+a network hop and reports throughput and latency percentiles per endpoint.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from benchmarks._harness import summarize
+
+RequestSpec = Tuple[str, str, Optional[Dict[str, Any]], Optional[Any]]  # method, path, params, json
+
+
+def _planner_prompt(rng: random.Random) -> str:
+    # Mix of repeated and fresh prompts so the planner cache sees realistic traffic
+    if rng.random() < 0.5:
+        return "Set up a new repo; write README; add CI"
+    return f"Draft design {rng.randrange(10**6)}; implement it and then review"
+
+
+ENDPOINTS: Dict[str, Callable[[random.Random], RequestSpec]] = {
+    "healthcheck": lambda rng: ("GET", "/healthcheck", None, None),
+    "planner_dispatch": lambda rng: ("POST", "/planner/dispatch", None, {"prompt": _planner_prompt(rng), "task_type": "general"}),
+    "planner_dispatch_batch": lambda rng: (
+        "POST",
+        "/planner/dispatch_batch",
+        None,
+        [{"prompt": _planner_prompt(rng), "task_type": "coding"} for _ in range(16)],
+    ),
+    "memory_search": lambda rng: ("GET", "/memory/search", {"q": "plan the vector memory search", "n": 5}, None),
+    "memory_logs": lambda rng: ("GET", "/memory/logs", {"limit": 50}, None),
+    "debugger_run": lambda rng: ("POST", "/debugger/run", None, {"code": "print(sum(range(1000)))", "language": "python"}),
+}
+
+
+def seed_corpus(n: int, seed: int = 11) -> None:
+    """Pre-fill the vector store with n synthetic documents."""
+    from ai_factory.memory.memory_embeddings import add_many_to_memory
+
+    rng = random.Random(seed)
+    words = "plan build test deploy review refactor index search memory vector planner debugger".split()
+    batch: List[Tuple[str, str]] = []
+    for i in range(n):
+        batch.append((f"seed-{seed}-{i}", " ".join(rng.choice(words) for _ in range(40))))
+        if len(batch) == 1000:
+            add_many_to_memory(batch)
+            batch = []
+    add_many_to_memory(batch)
+
+
+@asynccontextmanager
+async def _client(app: Any, lifespan: bool) -> AsyncIterator[httpx.AsyncClient]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        if lifespan:
+            async with app.router.lifespan_context(app):
+                yield client
+        else:
+            yield client
+
+
+async def _drive(client: httpx.AsyncClient, name: str, requests: int, concurrency: int, seed: int) -> Dict[str, Any]:
+    make = ENDPOINTS[name]
+    rng = random.Random(seed)
+    specs = [make(rng) for _ in range(requests)]
+    latencies: List[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for spec in specs:
+        queue.put_nowait(spec)
+
+    async def worker() -> None:
+        nonlocal errors
+        while True:
+            try:
+                method, path, params, body = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            t0 = time.perf_counter()
+            try:
+                r = await client.request(method, path, params=params, json=body)
+                if r.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - t0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 6),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "latency": summarize(latencies),
+    }
+
+
+async def run_async(
+    endpoints: Sequence[str] = ("healthcheck", "planner_dispatch", "memory_search"),
+    requests: int = 200,
+    concurrency: int = 16,
+    corpus: int = 0,
+    lifespan: bool = True,
+    seed: int = 1,
+) -> Dict[str, Dict[str, Any]]:
+    from ai_factory.main import app
+
+    # httpx logs every request at INFO; that would dominate the measurement
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if corpus:
+        seed_corpus(corpus)
+    results: Dict[str, Dict[str, Any]] = {}
+    async with _client(app, lifespan) as client:
+        for name in endpoints:
+            key = f"{name}/c{concurrency}" + (f"/corpus{corpus}" if corpus else "")
+            results[key] = await _drive(client, name, requests, concurrency, seed)
+    return results
+
+
+def run(**kwargs: Any) -> Dict[str, Dict[str, Any]]:
+    return asyncio.run(run_async(**kwargs))
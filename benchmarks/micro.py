@@ -0,0 +1,113 @@
+"""
+Repeatable micro-benchmarks for hot functions.
+
+Each benchmark takes the shared options and returns {case_name: latency summary}.
+Run through the CLI: python -m benchmarks micro --only decompose hash_vector
+"""
+from __future__ import annotations
+
+import os
+import random
+import tempfile
+from typing import Any, Callable, Dict, List, Sequence
+
+from benchmarks._harness import measure
+
+_WORDS = "plan build test deploy review refactor index search memory vector planner debugger".split()
+
+
+def _corpus(n: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(_WORDS) for _ in range(40)) for _ in range(n)]
+
+
+def bench_decompose(sizes: Sequence[int], repeat: int, **_: Any) -> Dict[str, Dict[str, float]]:
+    from ai_factory.services.planner_service import StubPlanner
+    from benchmarks.bench_decompose import make_prompt
+
+    planner = StubPlanner(max_steps=256)
+    out = {}
+    for size in sizes:
+        prompt = make_prompt(size)
+        out[f"decompose/{size}B"] = measure(lambda: planner._heuristic_decompose(prompt, "coding"), repeat=repeat)
+    return out
+
+
+def bench_hash_vector(sizes: Sequence[int], repeat: int, **_: Any) -> Dict[str, Dict[str, float]]:
+    from ai_factory.memory.memory_embeddings import _hash_vector
+
+    out = {}
+    for size in sizes:
+        text = "x" * size
+        out[f"hash_vector/{size}B"] = measure(lambda: _hash_vector(text), repeat=repeat)
+    return out
+
+
+def bench_collection_query(corpus_sizes: Sequence[int], repeat: int, **_: Any) -> Dict[str, Dict[str, float]]:
+    from chromadb import PersistentClient
+    from ai_factory.memory.memory_embeddings import HashEmbeddingFunction
+
+    out = {}
+    for n in corpus_sizes:
+        client = PersistentClient(path=_scratch_dir("chroma"))
+        col = client.get_or_create_collection(name=f"bench-{n}", embedding_function=HashEmbeddingFunction())
+        docs = _corpus(n)
+        col.add(documents=docs, ids=[f"d{i}" for i in range(n)])
+        out[f"collection_query/{n}docs"] = measure(lambda: col.query(query_texts=["search the vector memory"], n_results=5), repeat=repeat)
+    return out
+
+
+def bench_log_event(repeat: int, **_: Any) -> Dict[str, Dict[str, float]]:
+    from ai_factory.memory.memory_store import log_event, log_events
+
+    prompt = " ".join(_corpus(1)[0] for _ in range(10))
+    counter = iter(range(10**9))
+    out = {
+        "log_event/single": measure(
+            lambda: log_event(f"bench-{next(counter)}", "general", prompt, '{"steps": []}'), repeat=repeat
+        ),
+        "log_events/batch100": measure(
+            lambda: log_events(
+                [{"request_id": f"bench-{next(counter)}", "task_type": "general", "prompt": prompt, "response": "{}"} for _ in range(100)]
+            ),
+            repeat=max(1, repeat // 4),
+        ),
+    }
+    return out
+
+
+def bench_run_python(repeat: int, **_: Any) -> Dict[str, Dict[str, float]]:
+    from ai_factory.debugger.debugger_runner import run_python
+
+    return {
+        "run_python/print": measure(lambda: run_python("print('bench')"), repeat=max(1, repeat // 4), warmup=1),
+    }
+
+
+def _scratch_dir(name: str) -> str:
+    path = os.path.join(tempfile.gettempdir(), "ai_factory_bench", name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+BENCHMARKS: Dict[str, Callable[..., Dict[str, Dict[str, float]]]] = {
+    "decompose": bench_decompose,
+    "hash_vector": bench_hash_vector,
+    "collection_query": bench_collection_query,
+    "log_event": bench_log_event,
+    "run_python": bench_run_python,
+}
+
+
+def run(
+    only: Sequence[str] = (),
+    sizes: Sequence[int] = (1024, 64 * 1024, 1024 * 1024),
+    corpus_sizes: Sequence[int] = (100, 1000, 10000),
+    repeat: int = 20,
+) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for name, fn in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        results.update(fn(sizes=sizes, corpus_sizes=corpus_sizes, repeat=repeat))
+    return results
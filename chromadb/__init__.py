@@ -10,14 +10,36 @@ class _Collection:
         self.name = name
         self.embedding_function = embedding_function
         self._docs: Dict[str, str] = {}
+        self._embeddings: Dict[str, List[float]] = {}
 
-    def add(self, documents: List[str], ids: List[str]) -> None:
+    def add(self, documents: List[str], ids: List[str], embeddings: Optional[List[List[float]]] = None, metadatas=None) -> None:
         for doc, _id in zip(documents, ids):
             self._docs[_id] = doc
+        if embeddings is not None:
+            for vec, _id in zip(embeddings, ids):
+                self._embeddings[_id] = list(vec)
 
-    def get(self, ids: List[str]) -> Dict[str, Any]:
-        found_ids = [_id for _id in ids if _id in self._docs]
-        return {"ids": found_ids, "documents": [self._docs[_id] for _id in found_ids]}
+    def count(self) -> int:
+        return len(self._docs)
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        found_ids = [_id for _id in ids if _id in self._docs] if ids is not None else list(self._docs)
+        found_ids = found_ids[offset or 0 :]
+        if limit is not None:
+            found_ids = found_ids[:limit]
+        include = include if include is not None else ["documents"]
+        result: Dict[str, Any] = {"ids": found_ids}
+        if "documents" in include:
+            result["documents"] = [self._docs[_id] for _id in found_ids]
+        if "embeddings" in include:
+            result["embeddings"] = [self._embeddings.get(_id) for _id in found_ids]
+        return result
 
     def query(self, query_texts: List[str], n_results: int = 3) -> Dict[str, Any]:
         # Extremely naive lexical similarity: shared token count
@@ -42,11 +64,15 @@ class _Collection:
         return {"ids": results_ids, "documents": results_docs, "distances": results_scores}
 
 
+# Collections outlive their client, keyed by path, the way on-disk ones would
+_STORES: Dict[str, Dict[str, _Collection]] = {}
+
+
 class PersistentClient:
     def __init__(self, path: str):
         self.path = path
         os.makedirs(self.path, exist_ok=True)
-        self._collections: Dict[str, _Collection] = {}
+        self._collections = _STORES.setdefault(os.path.abspath(path), {})
 
     def get_or_create_collection(self, name: str, embedding_function=None, metadata: Optional[Dict[str, Any]] = None):
         if name not in self._collections:
@@ -0,0 +1,91 @@
+import asyncio
+import os
+import threading
+import uuid
+
+from fastapi.testclient import TestClient
+
+# Force FAKE embeddings to avoid model downloads during tests
+os.environ["AI_FACTORY_EMBEDDINGS_BACKEND"] = "FAKE"
+
+from ai_factory.debugger import debugger_store
+from ai_factory.main import app
+from ai_factory.memory import memory_db, memory_store
+from ai_factory.memory.dedup import content_id
+from ai_factory.services.middleware import _dedup_key
+
+client = TestClient(app)
+
+
+def test_log_event_async_writes_event_and_doc_refs_together():
+    req_id = f"async-{uuid.uuid4()}"
+    doc_id = content_id(req_id)
+
+    async def roundtrip():
+        await memory_store.log_event_async(req_id, "general", "hello", '{"steps": []}', doc_refs=[(doc_id, req_id)])
+        return await memory_store.find_by_request_id_async(req_id), await memory_store.list_events_async(50)
+
+    found, listed = asyncio.run(roundtrip())
+    assert [e.prompt for e in found] == ["hello"]
+    assert any(e.request_id == req_id for e in listed)
+    assert memory_store.doc_references([doc_id])[doc_id].request_ids == [req_id]
+
+
+def test_concurrent_async_runs_are_all_persisted():
+    marker = uuid.uuid4().hex
+
+    async def burst():
+        await asyncio.gather(
+            *(debugger_store.log_run_async(f"{marker}-{i}", "python", f"# {marker}", str(i), "", "ok") for i in range(20))
+        )
+        return await debugger_store.list_runs_async(50), await debugger_store.search_run_snippets_async(marker, limit=50)
+
+    runs, matches = asyncio.run(burst())
+    assert sum(r.request_id.startswith(marker) for r in runs) == 20
+    assert sorted(int(m.snippet) for m in matches) == list(range(20))
+
+
+def test_async_apis_fall_back_to_threads_without_aiosqlite(monkeypatch):
+    monkeypatch.setattr(memory_store, "HAS_ASYNC_DB", False)
+    monkeypatch.setattr(debugger_store, "HAS_ASYNC_DB", False)
+    req_id = f"fallback-{uuid.uuid4()}"
+
+    async def roundtrip():
+        await memory_store.log_event_async(req_id, "general", "no driver", "{}")
+        await debugger_store.log_run_async(req_id, "python", "print(1)", "1\n", "", "ok")
+        return await memory_store.find_by_request_id_async(req_id), await debugger_store.find_by_request_id_async(req_id)
+
+    events, runs = asyncio.run(roundtrip())
+    assert [e.prompt for e in events] == ["no driver"] and [r.stdout for r in runs] == ["1\n"]
+
+
+def test_dispatch_logs_event_with_its_memory_reference():
+    prompt = f"Async store {uuid.uuid4()}; verify"
+    r = client.post("/planner/dispatch", json={"prompt": prompt, "task_type": "general"})
+    assert r.status_code == 200
+    req_id = r.headers["X-Request-ID"]
+    assert memory_store.find_by_request_id(req_id)
+    doc_id = content_id(_dedup_key("general", prompt))
+    assert req_id in memory_store.doc_references([doc_id])[doc_id].request_ids
+
+
+def test_async_engine_pools_per_loop_and_closed_loops_are_reaped():
+    marker = f"pool-{uuid.uuid4()}"
+    connects = []
+
+    async def writes():
+        loop = asyncio.get_running_loop()
+        for i in range(5):
+            await memory_store.log_event_async(f"{marker}-{i}", "general", "pooled", "{}")
+        sync_engine = memory_db._async_engines[loop][0].sync_engine
+        connects.append(sync_engine.pool.checkedin())
+        return [other for other in memory_db._async_engines if other is not loop]
+
+    asyncio.run(writes())
+    threads = threading.active_count()
+    for _ in range(5):
+        assert asyncio.run(writes()) == []
+    # One connection serves every write on a loop, and old loops' connection threads are stopped
+    assert connects == [1] * 6
+    assert threading.active_count() <= threads
+    assert len(memory_store.find_by_request_id(f"{marker}-4")) == 6
@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+
+# Force FAKE embeddings to avoid model downloads during tests
+os.environ["AI_FACTORY_EMBEDDINGS_BACKEND"] = "FAKE"
+
+from benchmarks import micro
+from benchmarks._harness import percentile, report, summarize
+from benchmarks.compare import compare
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_percentiles_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 99) == 99.0
+    s = summarize(samples)
+    assert s["n"] == 100 and s["p95"] == 95.0
+
+
+def test_micro_benchmarks_smoke():
+    results = micro.run(only=["decompose", "hash_vector", "collection_query"], sizes=[256], corpus_sizes=[20], repeat=2)
+    assert set(results) == {"decompose/256B", "hash_vector/256B", "collection_query/20docs"}
+    assert all(r["p50"] > 0 for r in results.values())
+
+
+def test_loadgen_reports_per_endpoint(tmp_path):
+    # Separate process: the app must import with AI_FACTORY_DB_PATH pointing at
+    # a scratch file, or the run writes into the checked-in database
+    out = tmp_path / "load.json"
+    env = {**os.environ, "AI_FACTORY_DB_PATH": str(tmp_path / "bench.db"), "AI_FACTORY_EMBEDDINGS_BACKEND": "FAKE"}
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks", "load", "--endpoints", "healthcheck", "planner_dispatch",
+         "--requests", "8", "--concurrency", "2", "--no-lifespan", "--out", str(out)],
+        cwd=REPO_ROOT, env=env, check=True, capture_output=True, timeout=120,
+    )
+    results = json.loads(out.read_text(encoding="utf-8"))["results"]
+    assert set(results) == {"healthcheck/c2", "planner_dispatch/c2"}
+    for r in results.values():
+        assert r["errors"] == 0
+        assert r["throughput_rps"] > 0
+        assert r["latency"]["p99"] >= r["latency"]["p50"]
+
+
+def test_compare_flags_regressions():
+    base = report("micro", {"x": {"p50": 1.0, "p99": 2.0}, "y": {"throughput_rps": 100.0}}, {})
+    cand = report("micro", {"x": {"p50": 1.5, "p99": 2.0}, "y": {"throughput_rps": 120.0}}, {})
+    rows = {(r["case"], r["metric"]): r for r in compare(base, cand)}
+    assert rows[("x", "p50")]["regression"] is True
+    assert rows[("x", "p99")]["regression"] is False
+    assert rows[("y", "throughput_rps")]["regression"] is False
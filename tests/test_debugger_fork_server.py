@@ -0,0 +1,96 @@
+import os
+import shutil
+import sys
+import time
+
+import pytest
+
+# Force FAKE embeddings to avoid model downloads during tests
+os.environ["AI_FACTORY_EMBEDDINGS_BACKEND"] = "FAKE"
+
+from ai_factory.config import settings
+from ai_factory.debugger import debugger_runner, fork_server
+from ai_factory.debugger.fork_server import ForkServer
+
+
+@pytest.fixture(scope="module")
+def server():
+    fs = ForkServer(["json"], memory_limit_mb=512)
+    fs.start()
+    yield fs
+    fs.shutdown()
+
+
+def test_fork_server_matches_cold_run_semantics(server):
+    ok = server.run("import json; print(json.dumps([1]))")
+    assert ok == {"stdout": "[1]\n", "stderr": "", "exit_code": 0, "status": "success"}
+
+    err = server.run("raise ValueError('boom')")
+    assert err["status"] == "error" and err["exit_code"] == 1
+    assert 'File "<debugger>", line 1' in err["stderr"] and "ValueError: boom" in err["stderr"]
+
+    assert server.run("import sys; sys.exit(3)")["exit_code"] == 3
+
+
+def test_fork_server_enforces_timeout_and_memory_limit(server):
+    slow = server.run("while True: pass", timeout=1)
+    assert slow["status"] == "timeout" and slow["exit_code"] == 124
+    big = server.run("x = bytearray(1024 ** 3)")
+    assert "MemoryError" in big["stderr"]
+
+
+def test_fork_server_timeout_outlives_closed_pipes(server):
+    t0 = time.monotonic()
+    r = server.run("import os, time; os.close(1); os.close(2); time.sleep(30)", timeout=1)
+    assert r["status"] == "timeout" and time.monotonic() - t0 < 5
+
+
+def test_run_python_never_resends_code_after_the_request_was_sent(monkeypatch):
+    def lost(conn):
+        raise ConnectionResetError("zygote went away")
+
+    def cold(*args, **kwargs):
+        raise AssertionError("snippet re-ran in a cold interpreter")
+
+    monkeypatch.setattr(settings, "debugger_fork_server", True)
+    monkeypatch.setattr(debugger_runner, "_fork_server", None)
+    monkeypatch.setattr(fork_server, "recv_frame", lost)
+    monkeypatch.setattr(debugger_runner, "run_file", cold)
+    try:
+        r = debugger_runner.run_code("python", "print(1)")
+        assert r["status"] == "error" and "zygote went away" in r["stderr"]
+    finally:
+        debugger_runner.shutdown_fork_server()
+
+
+def test_run_python_uses_fork_server_when_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "debugger_fork_server", True)
+    monkeypatch.setattr(debugger_runner, "_fork_server", None)
+    try:
+        r = debugger_runner.run_code("python", "import os; print(os.getppid() != 1)")
+        assert r["stdout"] == "True\n"
+        assert debugger_runner._fork_server is not None and debugger_runner._fork_server.running
+    finally:
+        debugger_runner.shutdown_fork_server()
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash not installed")
+def test_language_registry_runs_bash_only_when_enabled():
+    assert debugger_runner.supported_languages() == ["py", "python"]
+    assert debugger_runner.run_code("bash", "echo hi")["stderr"] == "Unsupported language: bash"
+    debugger_runner.configure_languages(["bash"])
+    try:
+        r = debugger_runner.run_code("bash", "echo hi; exit 4")
+        assert r["stdout"] == "hi\n" and r["exit_code"] == 4
+        assert "bash" in debugger_runner.supported_languages()
+    finally:
+        debugger_runner.configure_languages(settings.debugger_languages)
+    assert debugger_runner.run_code("cobol", "x")["stderr"] == "Unsupported language: cobol"
+
+
+def test_cold_runs_apply_limits_in_the_child(monkeypatch):
+    monkeypatch.setattr(settings, "debugger_memory_limit_mb", 256)
+    r = debugger_runner.run_file([sys.executable], "import resource; print(resource.getrlimit(resource.RLIMIT_AS)[0] // 2**20)", ".py", timeout=3)
+    assert r["stdout"] == "256\n"
+    r = debugger_runner.run_file([sys.executable], "import resource; print(resource.getrlimit(resource.RLIMIT_CPU)[0])", ".py", timeout=3)
+    assert r["stdout"] == "4\n"
@@ -0,0 +1,49 @@
+import os
+import uuid
+
+# Force FAKE embeddings to avoid model downloads during tests
+os.environ["AI_FACTORY_EMBEDDINGS_BACKEND"] = "FAKE"
+
+from sqlalchemy import desc, select, text
+from sqlalchemy.dialects import sqlite
+
+from ai_factory.debugger.debugger_store import RunRow, list_runs, log_run, search_run_snippets
+from ai_factory.memory.memory_db import DebuggerRun, engine, init_db
+from ai_factory.memory.memory_store import EventRow, list_events, log_event
+
+
+def test_list_runs_and_events_return_projected_rows():
+    req_id = f"proj-{uuid.uuid4()}"
+    log_run(req_id, "python", "print(1)", "1\n", "", "ok")
+    log_event(req_id, "general", "list me", '{"steps": []}')
+
+    run = next(r for r in list_runs(50) if r.request_id == req_id)
+    assert isinstance(run, RunRow) and run.status == "ok" and run.timestamp is not None
+    event = next(e for e in list_events(50) if e.request_id == req_id)
+    assert isinstance(event, EventRow) and event.prompt == "list me"
+    assert not hasattr(event, "response")
+
+
+def test_search_snippets_are_cut_in_sql_with_fallbacks():
+    marker = uuid.uuid4().hex
+    log_run("snip-1", "python", f"# {marker}\nprint('x' * 1000)", "x" * 1000, "", "ok")
+    log_run("snip-2", "python", f"# {marker} fails", "", "Traceback...", "error")
+    log_run("snip-3", "python", f"# {marker} silent", "", "", "ok")
+
+    snippets = {m.request_id: m.snippet for m in search_run_snippets(marker, limit=10)}
+    assert snippets["snip-1"] == "x" * 240
+    assert snippets["snip-2"] == "Traceback..."
+    assert snippets["snip-3"] == f"# {marker} silent"
+
+
+def test_debugger_list_is_an_index_only_scan():
+    init_db()
+    stmt = (
+        select(DebuggerRun.id, DebuggerRun.request_id, DebuggerRun.timestamp, DebuggerRun.language, DebuggerRun.status)
+        .order_by(desc(DebuggerRun.timestamp), desc(DebuggerRun.id))
+        .limit(10)
+    )
+    sql = str(stmt.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        plan = " ".join(row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql)))
+    assert "COVERING INDEX ix_debugger_runs_list" in plan
@@ -0,0 +1,66 @@
+import json
+import logging
+import logging.handlers
+import threading
+
+from ai_factory.logging_setup import JsonFormatter, SamplingFilter, setup_logging, shutdown_logging
+from ai_factory.tracing import start_span
+
+
+def _emit_and_flush(log_file, **kwargs):
+    setup_logging("DEBUG", log_file=str(log_file), **kwargs)
+    try:
+        with start_span("test", trace_id="trace-123"):
+            logging.getLogger("ai_factory.test").info("hello %s", "queue")
+        logging.getLogger("ai_factory.hot").debug("noisy")
+        logging.getLogger("ai_factory.hot").warning("important")
+    finally:
+        shutdown_logging()
+    return log_file.read_text(encoding="utf-8").splitlines()
+
+
+def test_queued_file_logging_flushes_on_shutdown(tmp_path):
+    lines = _emit_and_flush(tmp_path / "app.log")
+    assert any("hello queue" in l and "trace-123" in l for l in lines)
+    assert not any(isinstance(h, logging.handlers.RotatingFileHandler) for h in logging.getLogger().handlers)
+
+
+def test_json_formatter_and_sampling(tmp_path):
+    lines = _emit_and_flush(tmp_path / "app.log", json_format=True, sample_rates={"ai_factory.hot": 0.0})
+    records = [json.loads(l) for l in lines]
+    assert {"message": "hello queue", "trace_id": "trace-123"}.items() <= records[0].items()
+    messages = [r["message"] for r in records]
+    assert "noisy" not in messages
+    assert "important" in messages
+
+
+def test_exceptions_are_formatted_by_the_listener(tmp_path, monkeypatch):
+    log_file = tmp_path / "app.log"
+    callers = []
+    format_exception = JsonFormatter.formatException
+
+    def spy(self, exc_info):
+        callers.append(threading.current_thread())
+        return format_exception(self, exc_info)
+
+    monkeypatch.setattr(JsonFormatter, "formatException", spy)
+    setup_logging("DEBUG", json_format=True, log_file=str(log_file))
+    try:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("ai_factory.test").exception("failed")
+    finally:
+        shutdown_logging()
+    record = json.loads(log_file.read_text(encoding="utf-8").splitlines()[0])
+    assert record["message"] == "failed"
+    assert "ValueError: boom" in record["exc"]
+    assert callers and threading.current_thread() not in callers
+
+
+def test_sampling_filter_longest_prefix_wins():
+    f = SamplingFilter({"ai_factory": 0.0, "ai_factory.keep": 1.0})
+    rec = logging.LogRecord("ai_factory.keep.sub", logging.DEBUG, __file__, 1, "m", None, None)
+    assert f.filter(rec)
+    rec.name = "ai_factory.other"
+    assert not f.filter(rec)
@@ -0,0 +1,43 @@
+import os
+from fastapi.testclient import TestClient
+
+# Force FAKE embeddings to avoid model downloads during tests
+os.environ["AI_FACTORY_EMBEDDINGS_BACKEND"] = "FAKE"
+
+from ai_factory.main import app
+from ai_factory.memory import memory_embeddings
+from ai_factory.memory.search_cache import SearchResultCache, search_key
+
+client = TestClient(app)
+
+
+def test_search_cache_invalidates_on_new_generation():
+    cache = SearchResultCache(maxsize=4, ttl=60)
+    key = search_key("plan  the\nrelease", 3)
+    assert key == search_key("plan the release", 3)
+    cache.set(key, 1, {"ids": [["a"]]})
+
+    hit = cache.get(key, 1)
+    assert hit == {"ids": [["a"]]}
+    hit["ids"][0].append("mutated")
+    assert cache.get(key, 1) == {"ids": [["a"]]}
+    assert cache.get(key, 2) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stale"]) == (2, 1, 1)
+
+
+def test_memory_search_is_cached_until_collection_changes():
+    q = {"q": "cached search about quarterly roadmap", "n": 3}
+    client.get("/memory/search", params=q)
+    before = client.get("/memory/search/cache/stats").json()
+    client.get("/memory/search", params=q)
+    after = client.get("/memory/search/cache/stats").json()
+    assert after["enabled"] is True
+    assert after["hits"] == before["hits"] + 1
+
+    memory_embeddings.add_to_memory("search-cache-doc", "quarterly roadmap cached search")
+    r = client.get("/memory/search", params=q)
+    assert any("search-cache-doc" in hit["request_ids"] for hit in r.json()["results"])
+    final = client.get("/memory/search/cache/stats").json()
+    assert final["generation"] > after["generation"]
+    assert final["stale"] == after["stale"] + 1
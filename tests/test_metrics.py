@@ -0,0 +1,48 @@
+import os
+import uuid
+from fastapi.testclient import TestClient
+
+# Force FAKE embeddings to avoid model downloads during tests
+os.environ["AI_FACTORY_EMBEDDINGS_BACKEND"] = "FAKE"
+
+from ai_factory.main import app
+from ai_factory.metrics import MetricsRegistry, timed
+
+client = TestClient(app)
+
+
+def test_histogram_buckets_are_cumulative():
+    reg = MetricsRegistry()
+    h = reg.histogram("t_seconds", "test", label_names=("stage",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 5.0):
+        h.observe(v, "x")
+    text = reg.render()
+    assert 't_seconds_bucket{stage="x",le="0.1"} 1' in text
+    assert 't_seconds_bucket{stage="x",le="1.0"} 2' in text
+    assert 't_seconds_bucket{stage="x",le="+Inf"} 3' in text
+    assert 't_seconds_count{stage="x"} 3' in text
+
+
+def test_timed_decorator_and_context_manager():
+    @timed("unit_test_stage")
+    def work():
+        return 42
+
+    assert work() == 42
+    with timed("unit_test_stage"):
+        pass
+    assert 'stage="unit_test_stage"' in client.get("/metrics").text
+
+
+def test_metrics_endpoint_reports_stages_and_gauges():
+    client.post("/planner/dispatch", json={"prompt": f"Measure {uuid.uuid4()}; report", "task_type": "general"})
+    client.post("/debugger/run", json={"code": "print(1)", "language": "python"})
+    client.get("/memory/search", params={"q": "measure"})
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    for stage in ("planner_compute", "sqlite_insert", "embedding", "vector_add", "vector_query", "subprocess_spawn", "subprocess_exec"):
+        assert f'ai_factory_stage_latency_seconds_count{{stage="{stage}"}}' in r.text
+    assert "ai_factory_vector_collection_size" in r.text
+    assert 'ai_factory_planner_backend_requests{backend="stub",state="waiting"}' in r.text
+    assert "ai_factory_planner_pool_workers" in r.text
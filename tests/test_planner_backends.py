@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_factory.main import app
+from ai_factory.services.planner_backends import (
+    FakePlannerBackend,
+    ManagedBackend,
+    PlannerDispatcher,
+    register_backend,
+)
+
+client = TestClient(app)
+
+
+def test_identical_concurrent_requests_are_coalesced():
+    fake = FakePlannerBackend(latency=0.05)
+    managed = ManagedBackend(fake, concurrency=4, timeout=5)
+
+    async def burst():
+        return await asyncio.gather(*(managed.plan("Load test; repeat", "general") for _ in range(10)))
+
+    results = asyncio.run(burst())
+    assert fake.calls == 1
+    assert managed.stats()["coalesced"] == 9
+    assert len({r.request_id for r in results}) == 10
+
+
+def test_backend_timeout_raises():
+    managed = ManagedBackend(FakePlannerBackend(latency=0.5), concurrency=1, timeout=0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(managed.plan("slow", "general"))
+    assert managed.stats()["timeouts"] == 1
+
+
+def test_dispatcher_routes_by_task_type():
+    register_backend("fake-fast", lambda: FakePlannerBackend(latency=0))
+    d = PlannerDispatcher(default="stub", routes={"research": "fake-fast"})
+    items = [("Read papers; summarize", "research"), ("Write code", "coding")]
+    plans = asyncio.run(d.dispatch_many(items))
+    assert plans[0].model_name == "fake/planner-v0"
+    assert plans[1].model_name == "stub/planner-v0"
+    assert [p.task_type for p in plans] == ["research", "coding"]
+
+
+def test_backend_stats_endpoint():
+    client.post("/planner/dispatch", json={"prompt": "Route me", "task_type": "general"})
+    r = client.get("/planner/backends")
+    assert r.status_code == 200
+    assert "stub" in r.json()["backends"]
@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+# Force FAKE embeddings to avoid model downloads during tests
+os.environ["AI_FACTORY_EMBEDDINGS_BACKEND"] = "FAKE"
+
+from ai_factory.config import settings
+from ai_factory.main import app
+from ai_factory.memory import memory_embeddings
+from ai_factory.memory.memory_store import find_by_request_id
+from ai_factory.services import planner_service
+from ai_factory.services.planner_service import StubPlanner
+
+client = TestClient(app)
+
+
+def test_dispatch_batch_plans_and_logs_each_item():
+    payload = [
+        {"prompt": "Draft spec; review spec", "task_type": "general"},
+        {"prompt": "Write tests", "task_type": "coding"},
+        {"prompt": "Survey prior art and then summarize", "task_type": "research"},
+    ]
+    r = client.post("/planner/dispatch_batch", json=payload)
+    assert r.status_code == 200
+    assert r.headers.get("X-Request-ID")
+    data = r.json()
+    assert [d["task_type"] for d in data] == ["general", "coding", "research"]
+    assert len({d["request_id"] for d in data}) == 3
+    for d in data:
+        rows = find_by_request_id(d["request_id"])
+        assert any(evt.request_id == d["request_id"] for evt in rows)
+
+
+def test_dispatch_batch_rejects_empty():
+    r = client.post("/planner/dispatch_batch", json=[])
+    assert r.status_code == 400
+
+
+def test_dispatch_batch_plans_misses_in_process_pool(monkeypatch):
+    monkeypatch.setattr(settings, "planner_batch_workers", 2)
+    monkeypatch.setattr(settings, "planner_batch_parallel_min", 2)
+    items = [(f"Pool item {uuid.uuid4()}; step {i}", "general") for i in range(4)]
+    expected = [StubPlanner(max_steps=settings.planner_max_steps).plan(*item) for item in items]
+    try:
+        plans = planner_service.plan_batch(items)
+        assert planner_service._pool is not None
+    finally:
+        planner_service.shutdown_pool()
+    assert [[s.action for s in p.steps] for p in plans] == [[s.action for s in e.steps] for e in expected]
+    assert len({p.request_id for p in plans}) == 4
+
+
+def test_concurrent_batches_share_one_process_pool(monkeypatch):
+    created = []
+
+    class SlowPool:
+        def __init__(self, **kwargs):
+            time.sleep(0.05)  # widen the window between the None check and the assignment
+            created.append(self)
+
+        def shutdown(self, **kwargs):
+            pass
+
+    monkeypatch.setattr(planner_service, "ProcessPoolExecutor", SlowPool)
+    monkeypatch.setattr(planner_service, "_pool", None)
+    barrier = threading.Barrier(8)
+
+    def get():
+        barrier.wait()
+        return planner_service._get_pool()
+
+    with ThreadPoolExecutor(8) as ex:
+        pools = list(ex.map(lambda _: get(), range(8)))
+    planner_service.shutdown_pool()
+    assert len(created) == 1 and all(p is created[0] for p in pools)
+
+
+def test_add_many_without_dedup_suffixes_until_free(monkeypatch):
+    monkeypatch.setattr(settings, "memory_dedup", "none")
+    base = f"suffix-{uuid.uuid4()}"
+    for n in range(3):
+        memory_embeddings.add_many_to_memory([(base, f"document {n}")])
+    memory_embeddings.add_to_memory(base, "document 3")
+    found = memory_embeddings.collection.get(ids=[base, f"{base}:2", f"{base}:3", f"{base}:4"])
+    assert sorted(found["ids"]) == sorted([base, f"{base}:2", f"{base}:3", f"{base}:4"])
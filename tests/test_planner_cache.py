@@ -0,0 +1,60 @@
+import copy
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from ai_factory.main import app
+from ai_factory.memory.memory_db import PlannerCacheEntry, SessionLocal
+from ai_factory.services.planner_cache import CachedPlanner, MemoryPlannerCache, SQLitePlannerCache, cache_key
+from ai_factory.services.planner_service import StubPlanner
+
+client = TestClient(app)
+
+
+def test_cache_key_normalizes_whitespace():
+    assert cache_key("Plan  the\n release", "general") == cache_key("Plan the release", "general")
+    assert cache_key("Plan the release", "general") != cache_key("Plan the release", "coding")
+
+
+def test_cached_planner_reissues_ids_and_counts_hits():
+    cp = CachedPlanner(StubPlanner(), memory=MemoryPlannerCache(maxsize=8, ttl=60))
+    first = cp.plan("Write docs; ship it", "general")
+    second = cp.plan("Write docs;   ship it", "general")
+    assert first.request_id != second.request_id
+    assert [s.action for s in first.steps] == [s.action for s in second.steps]
+    stats = cp.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_cache_stats_endpoint():
+    payload = {"prompt": "Cache me; then serve me", "task_type": "general"}
+    r1 = client.post("/planner/dispatch", json=payload)
+    r2 = client.post("/planner/dispatch", json=payload)
+    assert r1.json()["request_id"] != r2.json()["request_id"]
+    r = client.get("/planner/cache/stats")
+    assert r.status_code == 200
+    data = r.json()
+    assert data["enabled"] is True
+    assert data["hits"] >= 1
+
+
+def test_sqlite_tier_prunes_expired_entries_on_write():
+    tier = SQLitePlannerCache(ttl=60)
+    resp = StubPlanner().plan("Prune me; soon", "general")
+    tier.set("prune-old", resp)
+    with SessionLocal() as session:
+        session.get(PlannerCacheEntry, "prune-old").created_at = datetime.utcnow() - timedelta(seconds=120)
+        session.commit()
+    assert tier.get("prune-old") is None
+    tier.set("prune-new", resp)
+    with SessionLocal() as session:
+        assert session.get(PlannerCacheEntry, "prune-old") is None
+        assert session.get(PlannerCacheEntry, "prune-new") is not None
+
+
+def test_cached_planner_copies_without_recursing():
+    cp = CachedPlanner(StubPlanner(), memory=MemoryPlannerCache(maxsize=8, ttl=60))
+    clone = copy.copy(cp)
+    assert clone.planner is cp.planner
+    with pytest.raises(AttributeError):
+        CachedPlanner.__new__(CachedPlanner).planner
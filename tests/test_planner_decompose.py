@@ -0,0 +1,46 @@
+from ai_factory.services.planner_service import StubPlanner
+
+
+def _legacy_candidates(prompt):
+    # Reference implementation the single-pass decomposer must match
+    text = " ".join(prompt.strip().split())
+    candidates = []
+    for sep in [".", ";", " and then ", " then ", " -> ", " — "]:
+        if sep in text:
+            candidates = [p for p in (p.strip(" -—>.;") for p in text.split(sep)) if p]
+            break
+    if not candidates:
+        words = text.split()
+        candidates = [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+    return candidates
+
+
+def test_matches_reference_segmentation():
+    planner = StubPlanner()
+    prompts = [
+        "Set up a new repo; write README; add CI",
+        "Gather data  and then\n clean it and then train",
+        "design then build then ship",
+        "a -> and then b",
+        "  then start then   finish  ",
+        "parse —  validate — store",
+        "...",
+        " ".join(f"word{i}" for i in range(30)),
+    ]
+    for p in prompts:
+        got = [s.action for s in planner._heuristic_decompose(p, "general")]
+        assert got == _legacy_candidates(p), p
+
+
+def test_coding_guard_step_and_indices():
+    steps = StubPlanner()._heuristic_decompose("Write tests; fix bugs", "coding")
+    assert steps[0].action.startswith("Scaffold repo")
+    assert [s.index for s in steps] == [0, 1, 2]
+    assert steps[1].rationale == "Derived from prompt segment 1."
+
+
+def test_max_steps_caps_large_prompts():
+    prompt = "Do the thing. " * 100_000
+    steps = StubPlanner(max_steps=50)._heuristic_decompose(prompt, "coding")
+    assert len(steps) == 51
+    assert steps[-1].index == 50
@@ -0,0 +1,74 @@
+import json
+import os
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+# Force FAKE embeddings to avoid model downloads during tests
+os.environ["AI_FACTORY_EMBEDDINGS_BACKEND"] = "FAKE"
+
+from ai_factory.main import app
+from ai_factory.memory.memory_store import create_snapshot, find_by_request_id
+from ai_factory.models import DispatchResponse, PlanStep
+from ai_factory import serialization
+from ai_factory.serialization import ModelJSONResponse, dumps
+
+client = TestClient(app)
+
+
+def test_model_response_matches_pydantic_json():
+    resp = DispatchResponse.make(
+        task_type="general",
+        steps=[PlanStep(index=i, action=f"step {i}", rationale="r") for i in range(3)],
+        estimated_tokens=40,
+    )
+    single = ModelJSONResponse(resp)
+    assert json.loads(single.body) == json.loads(resp.model_dump_json())
+    many = ModelJSONResponse([resp, resp])
+    assert len(many.items) == 2
+    assert json.loads(many.body) == [json.loads(resp.model_dump_json())] * 2
+
+
+def test_dumps_handles_unicode_and_datetimes():
+    out = dumps({"text": "naïve — ok", "n": 1})
+    assert json.loads(out) == {"text": "naïve — ok", "n": 1}
+    assert "naïve".encode("utf-8") in out
+    assert isinstance(dumps({"at": datetime.now(timezone.utc)}), bytes)
+
+
+def test_dumps_backends_agree_on_non_json_types(monkeypatch):
+    class Opaque:
+        def __str__(self):
+            return "opaque"
+
+    payload = {
+        "at": datetime(2024, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc),
+        "day": date(2024, 1, 2),
+        "id": uuid.UUID(int=5),
+        "amount": Decimal("1.50"),
+        "obj": Opaque(),
+    }
+    native = dumps(payload)
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert dumps(payload) == native
+    assert json.loads(native)["obj"] == "opaque"
+
+
+def test_dispatch_logs_reused_response_bytes():
+    r = client.post("/planner/dispatch", json={"prompt": "Serialize once; log once", "task_type": "general"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/json")
+    rows = find_by_request_id(r.headers["X-Request-ID"])
+    assert rows and json.loads(rows[0].response) == r.json()
+
+
+def test_snapshot_lines_are_json():
+    path = create_snapshot(limit=5)
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        assert all("request_id" in rec for rec in lines)
+    finally:
+        os.remove(path)
@@ -0,0 +1,89 @@
+import json
+import os
+import uuid
+
+from fastapi.testclient import TestClient
+
+# Force FAKE embeddings to avoid model downloads during tests
+os.environ["AI_FACTORY_EMBEDDINGS_BACKEND"] = "FAKE"
+
+from ai_factory.main import app
+from ai_factory.memory.memory_store import find_by_request_id
+from ai_factory.tracing import JsonlSpanExporter, NoopExporter, current_trace_id, start_span, tracer, valid_trace_id
+
+client = TestClient(app)
+
+
+def _read_spans(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_one_trace_id_across_middleware_planner_and_store(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer.configure(JsonlSpanExporter(str(path)), sample_rate=1.0)
+    try:
+        r = client.post("/planner/dispatch", json={"prompt": f"Trace {uuid.uuid4()}; done", "task_type": "general"})
+    finally:
+        tracer.configure(NoopExporter())
+    assert r.status_code == 200
+    trace_id = r.headers["X-Request-ID"]
+    assert r.json()["request_id"] == trace_id
+    assert find_by_request_id(trace_id)
+
+    spans = [s for s in _read_spans(path) if s["trace_id"] == trace_id]
+    names = {s["name"] for s in spans}
+    assert {"http.request", "planner.backend", "planner.plan", "memory.log_event", "memory.index_documents"} <= names
+    root = next(s for s in spans if s["name"] == "http.request")
+    assert root["parent_id"] is None
+    assert all(s["parent_id"] for s in spans if s is not root)
+
+
+def test_batch_items_derive_from_batch_trace():
+    r = client.post("/planner/dispatch_batch", json=[{"prompt": "a; b"}, {"prompt": "c; d"}])
+    trace_id = r.headers["X-Request-ID"]
+    assert [d["request_id"] for d in r.json()] == [f"{trace_id}:0", f"{trace_id}:1"]
+
+
+def test_unsampled_spans_still_propagate_ids(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer.configure(JsonlSpanExporter(str(path)), sample_rate=0.0)
+    try:
+        with start_span("root", trace_id="fixed-trace"):
+            with start_span("child"):
+                assert current_trace_id() == "fixed-trace"
+    finally:
+        tracer.configure(NoopExporter(), sample_rate=1.0)
+    assert current_trace_id() is None
+    assert not path.exists() or path.read_text() == ""
+
+
+def test_debugger_run_uses_trace_id():
+    r = client.post("/debugger/run", json={"code": "print('traced')", "language": "python"})
+    assert r.json()["request_id"] == r.headers["X-Debug-Request-ID"]
+
+
+def test_inbound_request_id_is_validated(tmp_path):
+    inbound = str(uuid.uuid4())
+    r = client.post("/planner/dispatch", json={"prompt": "Honor me"}, headers={"X-Request-ID": inbound.upper()})
+    assert r.headers["X-Request-ID"] == inbound
+
+    path = tmp_path / "spans.jsonl"
+    tracer.configure(JsonlSpanExporter(str(path)), sample_rate=1.0)
+    try:
+        bad = "../../" + "x" * 500
+        r = client.post("/planner/dispatch", json={"prompt": "Reject me"}, headers={"X-Request-ID": bad})
+    finally:
+        tracer.configure(NoopExporter())
+    trace_id = r.headers["X-Request-ID"]
+    assert trace_id != bad and valid_trace_id(trace_id) == trace_id
+    root = next(s for s in _read_spans(path) if s["trace_id"] == trace_id and s["name"] == "http.request")
+    assert root["attributes"]["inbound_request_id"] == bad[:128]
+
+
+def test_valid_trace_id_accepts_uuids_and_hex_only():
+    assert valid_trace_id("4BF92F3577B34DA6A3CE929D0E0E4736") == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert valid_trace_id(None) is None
+    assert valid_trace_id("abc") is None
+    assert valid_trace_id("f" * 65) is None
+    assert valid_trace_id("not-a-uuid-but-has-dashes-0000") is None
@@ -0,0 +1,127 @@
+import os
+
+import pytest
+
+# Force FAKE embeddings to avoid model downloads during tests
+os.environ["AI_FACTORY_EMBEDDINGS_BACKEND"] = "FAKE"
+
+np = pytest.importorskip("numpy")
+
+from chromadb import PersistentClient
+
+from ai_factory.memory.memory_embeddings import HashEmbeddingFunction
+from ai_factory.memory import vector_index
+from ai_factory.memory.vector_index import QuantizedCollection, QuantizedVectorIndex
+
+
+def _data(n=2000, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((32, dim))
+    return (centers[rng.integers(0, 32, n)] + 0.5 * rng.standard_normal((n, dim))).astype(np.float32)
+
+
+@pytest.mark.parametrize("dtype,ratio", [("float16", 2), ("int8", 4)])
+def test_quantized_index_shrinks_memory_and_keeps_recall(dtype, ratio):
+    data = _data()
+    ids = [f"d{i}" for i in range(len(data))]
+    exact = QuantizedVectorIndex("float32")
+    quant = QuantizedVectorIndex(dtype)
+    for start in range(0, len(data), 500):  # several adds exercise growth and re-calibration
+        exact.add(ids[start : start + 500], data[start : start + 500])
+        quant.add(ids[start : start + 500], data[start : start + 500])
+
+    params = 2 * 64 * 4 if dtype == "int8" else 0  # per-dimension scale + offset
+    assert (quant.nbytes() - params) * ratio == exact.nbytes()
+    hits = 0
+    for q in _data(20, seed=1):
+        truth, _ = exact.search(q, 10)
+        found, dists = quant.search(q, 10, rerank=4)
+        hits += len(set(truth) & set(found))
+        assert dists == sorted(dists)
+    assert hits / 200 >= 0.98
+
+
+def test_upsert_replaces_vector():
+    index = QuantizedVectorIndex("int8")
+    index.add(["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+    index.add(["a"], [[0.0, 1.0]])
+    assert len(index) == 2
+    ids, dists = index.search([0.0, 1.0], k=2)
+    assert set(ids) == {"a", "b"} and max(dists) < 1e-3
+
+
+def test_quantized_collection_query_shape():
+    ef = HashEmbeddingFunction()
+    col = QuantizedCollection(QuantizedVectorIndex("int8"), ef)
+    col.add(documents=["alpha", "beta", "gamma"], ids=["1", "2", "3"])
+    assert col.count() == 3
+    assert col.get(["3", "missing", "1"]) == {"ids": ["3", "1"], "documents": ["gamma", "alpha"]}
+
+    res = col.query(query_texts=["beta"], n_results=2)
+    assert res["ids"][0][0] == "2" and res["documents"][0][0] == "beta"
+    assert res["distances"][0][0] == pytest.approx(0.0, abs=1e-5)
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_reopened_store_serves_the_same_results_without_re_embedding(tmp_path, dtype):
+    ef = HashEmbeddingFunction()
+    calls = []
+
+    def counting_ef(texts):
+        calls.append(len(texts))
+        return ef(texts)
+
+    path = str(tmp_path)
+    first = QuantizedCollection(QuantizedVectorIndex(dtype, path=path), counting_ef, path=path)
+    first.add(documents=[f"document number {i}" for i in range(50)], ids=[str(i) for i in range(50)])
+    first.add(documents=["document number 7, revised"], ids=["7"])
+    before = first.query(query_texts=["document number 7"], n_results=3)
+    first.close()
+    assert calls == [50, 1, 1]
+
+    # A restart: new index and collection over the same directory
+    reopened = QuantizedCollection(QuantizedVectorIndex(dtype, path=path), ef, path=path)
+    assert reopened.count() == 50 and len(reopened.index) == 50
+    assert reopened.query(query_texts=["document number 7"], n_results=3) == before
+    assert reopened.get(["7"])["documents"] == ["document number 7, revised"]
+    reopened.close()
+
+
+def test_reopen_with_another_dtype_re_encodes_from_the_float32_rows(tmp_path):
+    data = _data(300, dim=16)
+    ids = [f"d{i}" for i in range(len(data))]
+    index = QuantizedVectorIndex("int8", path=str(tmp_path))
+    index.add(ids, data)
+    expected, _ = index.search(data[5], 5)
+    index.close()
+
+    reopened = QuantizedVectorIndex("float16", path=str(tmp_path))
+    assert reopened.search(data[5], 5)[0] == expected
+    assert reopened.nbytes() == 300 * 16 * 2
+    reopened.close()
+
+
+def test_import_from_chroma_keeps_stored_vectors(tmp_path):
+    ef = HashEmbeddingFunction()
+    chroma = PersistentClient(path=str(tmp_path / "chroma")).get_or_create_collection("m")
+    chroma.add(documents=["alpha", "beta"], ids=["1", "2"], embeddings=ef(["alpha", "beta"]))
+    chroma.add(documents=["gamma"], ids=["3"])  # no stored vector: embedded on import
+
+    col = QuantizedCollection(QuantizedVectorIndex("int8"), ef)
+    assert col.import_from(chroma, page=2) == 3
+    assert col.query(query_texts=["gamma"], n_results=1)["ids"] == [["3"]]
+
+
+def test_reopen_reads_persisted_int8_codes_once_calibration_is_frozen(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_index, "_CALIBRATE_UNTIL", 64)
+    data = _data(300, dim=16)
+    index = QuantizedVectorIndex("int8", path=str(tmp_path))
+    for start in range(0, 300, 100):
+        index.add([f"d{i}" for i in range(start, start + 100)], data[start : start + 100])
+    codes, scale = index._codes[:300].copy(), index._scale.copy()
+    index.close()
+
+    reopened = QuantizedVectorIndex("int8", path=str(tmp_path))
+    # Not re-fitted: the codes and ranges are the ones written before the restart
+    assert np.array_equal(reopened._codes[:300], codes) and np.array_equal(reopened._scale, scale)
+    reopened.close()
@@ -0,0 +1,119 @@
+import os
+import socket
+import tempfile
+import threading
+
+import pytest
+
+# Force FAKE embeddings to avoid model downloads during tests
+os.environ["AI_FACTORY_EMBEDDINGS_BACKEND"] = "FAKE"
+
+from chromadb import PersistentClient
+from sqlalchemy import text
+
+from ai_factory.memory.memory_db import engine
+from ai_factory.memory import vector_server
+from ai_factory.memory.vector_server import RemoteCollection, VectorServer, VectorServerError
+
+
+@pytest.fixture
+def server():
+    tmp = tempfile.mkdtemp()
+    collection = PersistentClient(path=tmp).get_or_create_collection(name="memory")
+    srv = VectorServer(os.path.join(tmp, "vec.sock"), collection)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_remote_collection_round_trip(server):
+    a = RemoteCollection(server.path)
+    b = RemoteCollection(server.path)  # e.g. another worker
+    a.add(documents=["scaffold a repo and add CI", "tune sqlite"], ids=["r1", "r2"], embeddings=[[0.1, 0.2], [0.3, 0.4]])
+
+    assert b.count() == 2
+    assert b.generation() == 1
+    assert b.get(ids=["r1", "missing"])["ids"] == ["r1"]
+    res = b.query(query_texts=["scaffold a repo"], n_results=1)
+    assert res["ids"] == [["r1"]]
+    assert server.collection._embeddings["r2"] == [0.3, 0.4]
+
+
+def test_remote_collection_reconnects_and_surfaces_errors(server):
+    c = RemoteCollection(server.path)
+    assert c.count() == 0
+    c._local.sock.close()  # simulate a dropped connection; the next call retries
+    assert c.count() == 0
+    with pytest.raises(VectorServerError):
+        c._call("delete", ids=["r1"])
+
+
+def test_writes_are_never_resent(server, monkeypatch):
+    c = RemoteCollection(server.path)
+    assert c.count() == 0
+    # The server goes away after receiving the add: the client can't know it
+    # was applied, so it must raise rather than send it again
+    real_recv = vector_server.recv_frame
+
+    def drop_after_send(sock):
+        raise ConnectionError("vector server connection closed")
+
+    monkeypatch.setattr(vector_server, "recv_frame", drop_after_send)
+    with pytest.raises(ConnectionError):
+        c.add(documents=["once"], ids=["once"], embeddings=[[0.5, 0.5]])
+    monkeypatch.setattr(vector_server, "recv_frame", real_recv)
+    assert c.count() == 1
+    assert c.generation() == 1
+    # A connection known to be dead before sending is replaced, even for writes
+    c._local.sock.shutdown(socket.SHUT_RDWR)
+    c.add(documents=["twice"], ids=["twice"], embeddings=[[0.5, 0.4]])
+    assert c.generation() == 2
+
+
+def test_sqlite_connections_use_wal_and_busy_timeout():
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() > 0
+
+
+def test_serve_shares_the_collection_memory_embeddings_opened(monkeypatch):
+    from ai_factory.memory import memory_embeddings
+
+    served = []
+
+    class Recorder:
+        def __init__(self, path, collection):
+            served.append(collection)
+
+        def serve_forever(self):
+            pass
+
+        def server_close(self):
+            pass
+
+    monkeypatch.setattr(vector_server, "VectorServer", Recorder)
+    vector_server.serve("/tmp/unused.sock")
+    assert served == [memory_embeddings.collection]
+
+
+def test_launcher_creates_schema_once_before_workers_start(monkeypatch):
+    uvicorn = pytest.importorskip("uvicorn")
+    from ai_factory import serve
+
+    calls = []
+    monkeypatch.setattr(serve, "init_db", lambda: calls.append("init_db"))
+    monkeypatch.setattr(uvicorn, "run", lambda *a, **kw: calls.append(("run", kw["workers"])))
+    serve.main(["--workers", "1"])
+    assert calls == ["init_db", ("run", 1)]
+
+
+def test_launcher_refuses_minhash_dedup_with_several_workers(monkeypatch):
+    from ai_factory import serve
+    from ai_factory.config import settings
+
+    monkeypatch.setattr(settings, "memory_dedup", "minhash")
+    monkeypatch.setattr(serve, "start_vector_server", lambda path: pytest.fail("started despite minhash"))
+    with pytest.raises(SystemExit):
+        serve.main(["--workers", "2"])